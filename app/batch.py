@@ -0,0 +1,64 @@
+# batch.py
+# Headless batch pricing: runs the same pipeline as the Streamlit pages over a
+# directory of tender workbooks, one process per tender. Run from the repo root:
+#     python -m app.batch tenders/ --rules uplifts.csv --out priced/ --format "CSV (.csv)"
+
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from app.utils.formatter import EXPORT_FORMATS
+from app.utils.pipeline import price_tender_to_file
+from app.utils.uplift_rules import load_rules
+
+
+def find_tenders(inputs):
+    """Return the .xlsx workbooks named directly or found in the given directories."""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(sorted(glob.glob(os.path.join(item, "*.xlsx"))))
+        else:
+            paths.append(item)
+    # Skip Excel lock files such as ~$tender.xlsx
+    return [p for p in paths if not os.path.basename(p).startswith("~$")]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Price a directory of tender workbooks without the UI.")
+    parser.add_argument("inputs", nargs="+", help="Tender .xlsx files or directories containing them")
+    parser.add_argument("--rules", help="Uplift rules file (.csv or .json); omit for zero uplifts")
+    parser.add_argument("--out", default="priced", help="Output directory (default: priced)")
+    parser.add_argument("--format", default="Excel (.xlsx)", choices=list(EXPORT_FORMATS))
+    parser.add_argument("--workers", type=int, default=None, help="Processes to use (default: all cores)")
+    args = parser.parse_args(argv)
+
+    tenders = find_tenders(args.inputs)
+    if not tenders:
+        parser.error("no tender workbooks found")
+    rules = load_rules(args.rules) if args.rules else []
+    os.makedirs(args.out, exist_ok=True)
+
+    start = time.perf_counter()
+    failures = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(price_tender_to_file, path, args.out, rules, args.format): path for path in tenders}
+        for future in as_completed(futures):
+            try:
+                summary = future.result()
+                print(f"✓ {summary['tender']}: {summary['tables']} tables, {summary['mpxns']} MPXNs -> {summary['output']}")
+                for message in summary["skipped"]:
+                    print(f"  ! {message}; it was skipped", file=sys.stderr)
+            except Exception as e:
+                failures += 1
+                print(f"✗ {futures[future]}: {e}", file=sys.stderr)
+
+    print(f"Priced {len(tenders) - failures}/{len(tenders)} tenders in {time.perf_counter() - start:.1f}s")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+# main.py
+# Single deployable entry point (the Procfile runs `streamlit run app/main.py`).
+# The page comes from the ?page= query parameter, else BESPOKE_PAGE, and runs
+# as a plain Streamlit script. The first run in each server process records
+# cold-start (process start to first script) and first-paint times.
+
+import glob
+import json
+import os
+import runpy
+import time
+
+_started = time.perf_counter()
+
+import streamlit as st
+from utils.instrumentation import STARTUP, logger, process_uptime
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+PAGES = {os.path.splitext(os.path.basename(path))[0]: path
+         for path in sorted(glob.glob(os.path.join(APP_DIR, "main?*.py")))}
+ALIASES = {"broker": "main1", "uplift": "main11", "compare": "main_compare"}
+DEFAULT_PAGE = os.environ.get("BESPOKE_PAGE", "main1")
+
+page = st.query_params.get("page", DEFAULT_PAGE)
+page = ALIASES.get(page, page)
+if page not in PAGES:
+    st.error(f"Unknown page '{page}'. Choose one of: {', '.join(list(ALIASES) + list(PAGES))}")
+    st.stop()
+
+cold = not STARTUP
+boot_seconds = process_uptime() if cold else None
+try:
+    runpy.run_path(PAGES[page], run_name="__main__")
+finally:
+    if cold:
+        # Logged even when the page stops early (e.g. st.stop() on a bad upload)
+        STARTUP.update(page=page, boot_seconds=boot_seconds,
+                       first_paint_seconds=round(time.perf_counter() - _started, 3))
+        logger.info(json.dumps({"stage": "cold start", **STARTUP}))
+
+if STARTUP and st.session_state.get("show_stage_timings"):
+    boot = f"server boot {STARTUP['boot_seconds']:.1f}s · " if STARTUP["boot_seconds"] is not None else ""
+    st.sidebar.caption(f"🚀 Cold start ({STARTUP['page']}): {boot}first paint {STARTUP['first_paint_seconds']:.2f}s")
@@ -6,32 +6,47 @@
 # 4. TAC columns added (Total Annual Cost) for 12/24/36 months and displayed in grid.
 
 import streamlit as st
-import pandas as pd
-from io import BytesIO
-from dateutil.relativedelta import relativedelta
 from utils.versioning import get_current_version
+from utils.cost_calc import build_broker_output, TERMS
+from utils.contract_length import add_contract_length
+from utils.file_loader import format_skipped, format_timings, load_tender_sheets
+from utils.pivot import build_uplift_table
+from utils.tariff_schema import get_schema
+from utils.incremental import incremental_editor
+from utils.paged_grid import paged_editor
+from utils.dtypes import compact_table, format_bytes, session_memory
+from utils.shared_cache import SHARED, format_stats
+from utils.instrumentation import start_run, render_panel, stage, instrumented
+from utils.snapshots import render_restore, save_session
+from utils import jobs
+from utils.formatter import EXPORT_FORMATS, export_df, ZIP_MIME
+from utils.pdf_quotes import build_quotes_zip
+from utils.quality import quote_issues, render_issues
+
+PAGED_ROWS = 20_000  # Default to the paged grid above this many tender rows
+PREVIEW_ROWS = 1_000  # Rows of a finished broker output shown in its preview
 
 st.set_page_config(layout="wide")
+start_run()
 st.markdown(f"**App Version:** `{get_current_version()}`")
 
-# --- Helper Functions ---
-def load_supplier_data(uploaded_file, sheet_name):
-    return pd.read_excel(uploaded_file, sheet_name=sheet_name)
+# --- Background Jobs ---
+def broker_output_job(frame, schema, export_format, progress):
+    progress(0.05, "Building broker output")
+    with stage("broker output", rows_in=len(frame)):
+        final_output = build_broker_output(frame, {'MPXN': 'MPXN', 'EAC': 'EAC'}, schema)
+    progress(0.2, f"Writing {export_format}")
+    export_data, ext, mime = export_df(final_output, export_format,
+                                       progress=lambda done: progress(0.2 + 0.8 * done, f"Writing {export_format}"))
+    return export_data, final_output.head(PREVIEW_ROWS), f'broker_output_dyce_prices.{ext}', mime
 
-def calculate_annual_cost(sc, unit_rate, eac):
-    # Convert pence to pounds (assuming pence input)
-    return round(((sc * 365) + (unit_rate * eac)) / 100, 2)
 
-@st.cache_data
-def convert_df(df):
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        df.to_excel(writer, index=False)
-    output.seek(0)
-    return output
-
-def calculate_months(start, end):
-    return (end.year - start.year) * 12 + (end.month - start.month)
+def pdf_quotes_job(frame, schema, progress):
+    progress(0.02, "Building broker output")
+    final_output = build_broker_output(frame, {'MPXN': 'MPXN', 'EAC': 'EAC'}, schema)
+    progress(0.05, "Rendering quotes")
+    quotes = build_quotes_zip(final_output, progress=lambda done: progress(0.05 + 0.95 * done, "Rendering quotes"))
+    return quotes, None, 'dyce_quotes.zip', ZIP_MIME
 
 # --- Streamlit UI ---
 st.title('Bespoke Power Pricing Tool – Broker Output Format')
@@ -39,105 +54,94 @@ st.title('Bespoke Power Pricing Tool – Broker Output Format')
 uploaded_file = st.file_uploader("Upload Supplier Tender File (Excel)", type=["xlsx"])
 
 if uploaded_file:
-    sheet_option = st.selectbox("Select Pricing Type:", ('Standard', 'Green'))
-    df_all = load_supplier_data(uploaded_file, sheet_name=sheet_option)
-
-    # Date conversions and contract length calculation
-    df_all['CSD'] = pd.to_datetime(df_all['CSD'], dayfirst=True)
-    df_all['CED'] = pd.to_datetime(df_all['CED'], dayfirst=True)
-    df_all['Contract Length'] = df_all.apply(lambda row: calculate_months(row['CSD'], row['CED']), axis=1)
-    df_all = df_all[df_all['Contract Length'].isin([12, 24, 36])]
-    df_all['Contract Length'] = df_all['Contract Length'].astype(str)
-
-    if 'EAC' not in df_all.columns:
-        st.error("Missing 'EAC' column in input file.")
+    # Both sheets are parsed in one pass so switching pricing type never re-reads the file; a sheet missing
+    # required columns is skipped from its header row. The upload's hash is remembered per session.
+    digest, tender_sheets, sheet_timings, skipped = load_tender_sheets(
+        uploaded_file, digests=st.session_state.setdefault("tender_digests", {}))
+    for message in format_skipped(skipped):
+        st.warning(f"⚠️ {message}")
+    if not tender_sheets:
+        st.error("⚠️ No tender sheet has the required columns.")
         st.stop()
+    st.caption(f"Sheets loaded: {format_timings(sheet_timings)}")
+    sheet_option = st.selectbox("Select Pricing Type:", tuple(tender_sheets))
 
-    # Count total rows read
-    total_rows = len(df_all)
-    st.info(f"Total rows read from Excel: {total_rows}")
-
-    # Use first EAC per MPXN
-    eac_map = df_all.groupby('MPXN')['EAC'].first().reset_index()
+    # Date conversions, contract length and the term filter run once per tender sheet, not on every rerun
+    def term_rows(sheet=tender_sheets[sheet_option]):
+        sheet = sheet.copy(deep=False)
+        with stage("dates", rows_in=len(sheet)) as record:
+            add_contract_length(sheet)
+            rows = sheet[sheet['Contract Length'].isin([int(term) for term in TERMS])]
+            record["rows_out"] = len(rows)
+        return sheet, rows
 
-    # Pivot Standing Charge & Unit Rate
-    cost_fields = ['Standing Charge (p/day)', 'Standard Rate (p/kWh)']
-    df_grouped = df_all.groupby(['MPXN', 'Contract Length'])[cost_fields].first().reset_index()
-    df_pivot = df_grouped.pivot(index='MPXN', columns='Contract Length', values=cost_fields)
-    df_pivot.columns = [f"{col[0]} {col[1]}m" for col in df_pivot.columns]
-    df_pivot.reset_index(inplace=True)
+    df_sheet, df_all = SHARED.get_or_build(("term rows", digest, sheet_option), term_rows)
 
-    displayed_rows = len(df_pivot)
-    st.info(f"Rows displayed in grid (unique MPXN): {displayed_rows}")
-
-    # Merge EAC and pivoted values
-    full_df = pd.merge(eac_map, df_pivot, on='MPXN', how='left')
+    # Repeated MPXN/term rows: checked once per tender sheet, on the sheet as loaded
+    render_issues(SHARED.get_or_build(("quality", digest, sheet_option), lambda: quote_issues(df_sheet)),
+                  file_stem=f"quote_issues_{sheet_option}")
 
-    # Add Uplift and TAC columns
-    for term in ['12', '24', '36']:
-        full_df[f'S/C Uplift {term}m'] = 0.000
-        full_df[f'Unit Rate Uplift {term}m'] = 0.000
-        full_df[f'TAC {term}m (£)'] = 0.00
+    # Count total rows read
+    total_rows = len(df_all)
+    st.info(f"Total rows read from Excel: {total_rows}")
 
-    # Data Editor
+    # Pivot Standing Charge & Unit Rate in one pass, with Uplift and TAC columns per term.
+    # The priced grid lives in session state; each edit only reprices the touched MPXN/terms.
+    schema = get_schema("STANDARD")
     st.subheader("Enter Uplifts Per MPXN & Contract Length")
-    editable_cols = ['MPXN', 'EAC']
-    for term in ['12', '24', '36']:
-        editable_cols += [
-            f"Standing Charge (p/day) {term}m",
-            f"Standard Rate (p/kWh) {term}m",
-            f"S/C Uplift {term}m",
-            f"Unit Rate Uplift {term}m",
-            f"TAC {term}m (£)"
-        ]
-
-    input_editor = st.data_editor(
-        full_df[editable_cols],
+    render_restore(digest)
+    paged = st.toggle("Paged grid (large portfolios)", value=len(df_all) > PAGED_ROWS)
+    uplift_grid = paged_editor if paged else incremental_editor
+    input_editor = uplift_grid(
+        "broker",
+        (digest, sheet_option),
+        instrumented("pivot")(lambda: compact_table(build_uplift_table(df_all, schema, terms=TERMS))),
+        schema,
+        "TAC {term}m (£)",
         use_container_width=True,
         hide_index=True,
         height=500,  # Scrollable grid
-        column_config={col: st.column_config.NumberColumn(step=0.001) for col in full_df.columns if 'Uplift' in col},
+        column_config={
+            f"{c.uplift} Uplift {term}m": st.column_config.NumberColumn(step=0.001)
+            for term in TERMS for c in schema.components
+        },
         num_rows="dynamic"
     )
 
-    if st.button("Generate Broker Output"):
-        output_rows = []
-
-        for _, row in input_editor.iterrows():
-            base = {
-                'MPXN': row['MPXN'],
-                'EAC': row['EAC']
-            }
-
-            for term in ['12', '24', '36']:
-                sc_col = f'Standing Charge (p/day) {term}m'
-                ur_col = f'Standard Rate (p/kWh) {term}m'
+    save_session(digest, ["broker"], file_name=uploaded_file.name)  # Survives a reload or restart
 
-                sc_uplift = row.get(f'S/C Uplift {term}m', 0)
-                ur_uplift = row.get(f'Unit Rate Uplift {term}m', 0)
+    st.sidebar.caption(f"💾 Session tables: {format_bytes(session_memory(st.session_state))}")
+    st.sidebar.caption(f"🗄️ Shared cache: {format_stats(SHARED.stats())}")
 
-                sc = row.get(sc_col, 0) + sc_uplift
-                ur = row.get(ur_col, 0) + ur_uplift
-                eac = row['EAC']
-
-                total_cost = calculate_annual_cost(sc, ur, eac)
+    displayed_rows = len(input_editor)
+    st.info(f"Rows displayed in grid (unique MPXN): {displayed_rows}")
+    missing_eac = int(input_editor["EAC"].isna().sum())
+    if missing_eac:
+        st.warning(f"{missing_eac} MPXNs have no EAC on any row, so their TAC is left blank.")
 
-                base.update({
-                    f'Standing Charge {term}m (p/day)': round(sc, 3),
-                    f'Unit Rate {term}m (p/kWh)': round(ur, 3),
-                    f'TAC {term}m (£)': total_cost
-                })
+    export_format = st.selectbox("Export format", list(EXPORT_FORMATS))
 
-            output_rows.append(base)
+    # Output is built and serialised on the background pool; the file waits in the job list
+    if st.button("Generate Broker Output"):
+        job_id = jobs.submit(
+            f"Broker output · {sheet_option} · {export_format}",
+            broker_output_job, input_editor.copy(deep=False), schema, export_format
+        )
+        st.session_state.setdefault("export_jobs", []).append(job_id)
+        st.success("Broker Output queued – you can keep editing while it builds.")
+
+    # One PDF per MPXN with every term's rates and TAC, rendered on a process pool
+    if st.button("Generate PDF Quotes"):
+        job_id = jobs.submit(
+            f"PDF quotes · {sheet_option} · {displayed_rows} MPXNs",
+            pdf_quotes_job, input_editor.copy(deep=False), schema
+        )
+        st.session_state.setdefault("export_jobs", []).append(job_id)
+        st.success("PDF quotes queued – they will appear under Exports as a zip.")
 
-        final_output = pd.DataFrame(output_rows)
-        st.success("Broker Output Generated")
-        st.dataframe(final_output, use_container_width=True)
+job_ids = jobs.session_jobs(st.session_state)
+if job_ids:
+    st.subheader("📥 Exports")
+    jobs.render_jobs(job_ids)
 
-        excel_data = convert_df(final_output)
-        st.download_button(
-            label="Download Broker Output",
-            data=excel_data,
-            file_name='broker_output_dyce_prices.xlsx',
-            mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
+render_panel()
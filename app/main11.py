@@ -2,113 +2,172 @@
 # Builds on V7 with Contract Length derivation, full TAC calculation, and correct pivoted table structure
 
 import streamlit as st
-import pandas as pd
-from io import BytesIO
+from utils.file_loader import format_skipped, format_timings, load_tender_sheets
+from utils.pipeline import prepared_sheet, uplift_table, apply_uplifts, pipeline_schema, TAC_LABEL
+from utils.incremental import incremental_editor, stored_frame, replace_frame
+from utils.paged_grid import paged_editor
+from utils.uplift_rules import load_rules, rules_frame, rules_from_frame
+from utils.dtypes import format_bytes, session_memory
+from utils.shared_cache import SHARED, format_stats
+from utils.instrumentation import start_run, render_panel
+from utils.snapshots import render_restore, save_session
+from utils.quality import quote_issues, render_issues
+from utils import jobs
+from utils.formatter import EXPORT_FORMATS, export_bundle, ZIP_MIME
+
+PAGED_ROWS = 20_000  # Default to the paged grid above this many tender rows
 
 # --- Streamlit Setup ---
 st.set_page_config(layout="wide")
+start_run()
 st.title("🔌 Bespoke Power Pricing Tool – V8 (TAC + Duration Logic)")
 
 # --- Upload Supplier Quote File ---
 file = st.file_uploader("Upload Supplier Tender File (Excel)", type=["xlsx"])
 
 if file:
-    sheet = st.selectbox("Select Sheet", options=["Standard", "Green"])
-    df_raw = pd.read_excel(file, sheet_name=sheet)
-
-    # --- Derive Contract Length ---
-    df_raw["CSD"] = pd.to_datetime(df_raw["CSD"], dayfirst=True, errors="coerce")
-    df_raw["CED"] = pd.to_datetime(df_raw["CED"], dayfirst=True, errors="coerce")
-    df_raw["Contract Length"] = ((df_raw["CED"] - df_raw["CSD"]) / pd.Timedelta(days=365)).round().astype(int)
-
-    # --- Detect HH ---
-    def is_hh(row):
-        return pd.notna(row.get("All Year - Day Rate (p/kWh)")) and \
-               pd.notna(row.get("All Year - Night Rate (p/kWh)")) and \
-               pd.notna(row.get("DUoS (p/KVA/Day)")) and \
-               pd.notna(row.get("Standing Charge (p/day)"))
-
-    df_raw["Is_HH"] = df_raw.apply(is_hh, axis=1)
-
-    # --- Split HH and NHH ---
-    df_nhh = df_raw[df_raw["Is_HH"] == False].copy()
-    df_hh = df_raw[df_raw["Is_HH"] == True].copy()
+    # Both sheets are parsed in one pass so switching sheet never re-reads the file; a sheet missing
+    # required columns is skipped from its header row. The upload's hash is remembered per session.
+    digest, tender_sheets, sheet_timings, skipped = load_tender_sheets(
+        file, digests=st.session_state.setdefault("tender_digests", {}))
+    for message in format_skipped(skipped):
+        st.warning(f"⚠️ {message}")
+    if not tender_sheets:
+        st.error("⚠️ No tender sheet has the required columns.")
+        st.stop()
+    st.caption(f"Sheets loaded: {format_timings(sheet_timings)}")
+    sheet = st.selectbox("Select Sheet", options=list(tender_sheets))
+
+    # Dates, meter classes and the HH/NHH split are worked out once per tender sheet, not on every rerun
+    df_raw, df_nhh, df_hh, class_counts = prepared_sheet(tender_sheets[sheet], (digest, sheet))
+    unpriced = len(df_raw) - len(df_nhh) - len(df_hh)
+    if unpriced:
+        st.warning(f"{unpriced} rows skipped: missing dates or no matching contract term.")
 
     st.success(f"Loaded {len(df_nhh)} NHH rows and {len(df_hh)} HH rows.")
+    render_issues(SHARED.get_or_build(("quality", digest, sheet), lambda: quote_issues(df_raw)),
+                  file_stem=f"quote_issues_{sheet}")
+    st.caption("Meter classes: " + " · ".join(f"{name} {count}" for name, count in class_counts.items() if count))
 
     # --- Function to Build Uplift Table with TAC ---
-    def build_uplift_editor(df, meter_type):
-        terms = [12, 24, 36]
-        df['EAC'] = df['EAC'].fillna(0)
-        df['Contract Length'] = df['Contract Length'].astype(str)
-
-        # Get one row per MPXN with EAC only once
-        base_df = df.drop_duplicates(subset=["MPXN"])[["MPXN", "EAC"]].copy()
-
-        for term in terms:
-            term_str = f"{term}"
-            sub_df = df[df['Contract Length'] == term_str].drop_duplicates(subset=["MPXN"])
-
-            if meter_type == "NHH":
-                for col in [
-                    "Standing Charge (p/day)",
-                    "Day Rate (p/kWh)",
-                    "Night Rate (p/kWh)",
-                    "E/W Rate (p/kWh)"
-                ]:
-                    mapping = sub_df.set_index("MPXN")[col]
-                    base_df[f"{col} {term}m"] = base_df["MPXN"].map(mapping)
-                for col in ["SC", "Day", "Night", "E/W"]:
-                    base_df[f"{col} Uplift {term}m"] = 0.000
-
-                tac = (
-                    base_df[f"Standing Charge (p/day) {term}m"] * 365 +
-                    base_df["EAC"] * (base_df[f"Day Rate (p/kWh) {term}m"] + base_df[f"Day Uplift {term}m"]) * 0.50 +
-                    base_df["EAC"] * (base_df[f"Night Rate (p/kWh) {term}m"] + base_df[f"Night Uplift {term}m"]) * 0.30 +
-                    base_df["EAC"] * (base_df[f"E/W Rate (p/kWh) {term}m"] + base_df[f"E/W Uplift {term}m"]) * 0.20
-                ) / 100
-                base_df[f"TAC_{term}m"] = tac.round(2)
-
+    def build_uplift_editor(df, meter_type, sheet_name=sheet):
+        # Pivoted tables are shared across sessions on the same tender; edits copy only touched columns.
+        # The compaction report is cached with the table, so every session's sidebar can show it.
+        def build():
+            report = {}
+            return uplift_table(df, meter_type, tac_label=TAC_LABEL, report=report), report[meter_type]
+
+        table, sizes = SHARED.get_or_build(("uplift", digest, sheet_name, meter_type, TAC_LABEL), build)
+        st.session_state.setdefault(f"memory_report_{sheet_name}", {})[meter_type] = sizes
+        return table
+
+    def editor_name(col):
+        return str(col).replace(" (£)", "").replace("(", "").replace(")", "").replace(" ", "_")
+
+    def warn_missing_eac(table, meter_type):
+        missing = int(table["EAC"].isna().sum())
+        if missing:
+            st.warning(f"{missing} {meter_type} MPXNs have no EAC on any row, so their TAC is left blank.")
+
+    # --- Bulk Uplift Rules ---
+    # Rules are applied to the whole table in one pass; the grid is then only for exceptions
+    with st.expander("⚙️ Bulk uplift rules"):
+        rules_file = st.file_uploader("Load rules (CSV/JSON)", type=["csv", "json"], key="rules_file")
+        try:
+            starting_rules = rules_frame(load_rules(rules_file) if rules_file is not None else ())
+        except ValueError as e:
+            st.error(f"⚠️ {e}")
+            starting_rules = rules_frame()
+        st.caption("Blank = any. EAC band is eac_min ≤ EAC < eac_max; later rules win where they overlap.")
+        edited_rules = st.data_editor(starting_rules, num_rows="dynamic", use_container_width=True, key="rules_editor")
+
+        if st.button("Apply rules"):
+            try:
+                rules = rules_from_frame(edited_rules)
+            except ValueError as e:
+                st.error(f"⚠️ {e}")
             else:
-                for col in [
-                    "Standing Charge (p/day)",
-                    "All Year - Day Rate (p/kWh)",
-                    "All Year - Night Rate (p/kWh)",
-                    "DUoS (p/KVA/Day)"
-                ]:
-                    mapping = sub_df.set_index("MPXN")[col]
-                    base_df[f"{col} {term}m"] = base_df["MPXN"].map(mapping)
-                for col in ["SC", "Day", "Night", "DUoS"]:
-                    base_df[f"{col} Uplift {term}m"] = 0.000
-
-                tac = (
-                    base_df[f"Standing Charge (p/day) {term}m"] * 365 +
-                    base_df[f"DUoS (p/KVA/Day) {term}m"] * 365 +
-                    base_df["EAC"] * (base_df[f"All Year - Day Rate (p/kWh) {term}m"] + base_df[f"Day Uplift {term}m"]) * 0.70 +
-                    base_df["EAC"] * (base_df[f"All Year - Night Rate (p/kWh) {term}m"] + base_df[f"Night Uplift {term}m"]) * 0.30
-                ) / 100
-                base_df[f"TAC_{term}m"] = tac.round(2)
-
-        return base_df
+                for meter_type, part in (("NHH", df_nhh), ("HH", df_hh)):
+                    if part.empty:
+                        continue
+                    key = f"{meter_type.lower()}_{sheet}"
+                    table = stored_frame(key, (digest, sheet))
+                    table = build_uplift_editor(part, meter_type) if table is None else table.copy(deep=False)
+                    replace_frame(key, (digest, sheet), apply_uplifts(table, meter_type, rules, TAC_LABEL))
+                st.success(f"Applied {len(rules)} rules.")
+
+    # Saved snapshots of this tender can be restored before the grids are drawn
+    render_restore(digest)
+
+    # Paged mode sends one page and one term to the browser; edits still land in the full table
+    paged = st.toggle("Paged grid (large portfolios)", value=len(df_raw) > PAGED_ROWS)
+    uplift_grid = paged_editor if paged else incremental_editor
 
     # --- Display NHH Table ---
+    # Priced tables live in session state per sheet; each edit only reprices the touched MPXN/terms
     if not df_nhh.empty:
         st.subheader("📘 NHH Quotes – Uplift Entry")
-        nhh_editor = build_uplift_editor(df_nhh, "NHH")
-        nhh_editor.columns = [str(col).replace(" (£)", "").replace("(", "").replace(")", "").replace(" ", "_") for col in nhh_editor.columns]
-        nhh_editor = nhh_editor.fillna(0)
         try:
-            edited_nhh = st.data_editor(nhh_editor, use_container_width=True, num_rows="dynamic")
+            edited_nhh = uplift_grid(
+                f"nhh_{sheet}", (digest, sheet), lambda: build_uplift_editor(df_nhh, "NHH"),
+                pipeline_schema("NHH"), TAC_LABEL, rename=editor_name,
+                use_container_width=True, num_rows="dynamic"
+            )
+            warn_missing_eac(edited_nhh, "NHH")
         except Exception as e:
             st.error(f"⚠️ Error displaying NHH table: {e}")
 
     # --- Display HH Table ---
     if not df_hh.empty:
         st.subheader("📗 HH Quotes – Uplift Entry")
-        hh_editor = build_uplift_editor(df_hh, "HH")
-        hh_editor.columns = [str(col).replace(" (£)", "").replace("(", "").replace(")", "").replace(" ", "_") for col in hh_editor.columns]
-        hh_editor = hh_editor.fillna(0)
         try:
-            edited_hh = st.data_editor(hh_editor, use_container_width=True, num_rows="dynamic")
+            edited_hh = uplift_grid(
+                f"hh_{sheet}", (digest, sheet), lambda: build_uplift_editor(df_hh, "HH"),
+                pipeline_schema("HH"), TAC_LABEL, rename=editor_name,
+                use_container_width=True, num_rows="dynamic"
+            )
+            warn_missing_eac(edited_hh, "HH")
         except Exception as e:
             st.error(f"⚠️ Error displaying HH table: {e}")
+
+    # --- Session Snapshot ---
+    # Edited tables of every sheet go to disk so a reload or restart can restore them
+    save_session(digest, [f"{m}_{name}" for name in tender_sheets for m in ("nhh", "hh")], file_name=file.name)
+
+    # --- Session Memory ---
+    with st.sidebar:
+        st.caption(f"💾 Session tables: {format_bytes(session_memory(st.session_state))}")
+        st.caption(f"🗄️ Shared cache: {format_stats(SHARED.stats())}")
+        for meter_type, (before, after) in st.session_state.get(f"memory_report_{sheet}", {}).items():
+            st.caption(f"{meter_type}: {format_bytes(before)} → {format_bytes(after)} after compaction")
+
+    # --- Export ---
+    # One file per sheet and meter type; sheets not yet opened are exported at zero uplift
+    st.subheader("📦 Export")
+    export_format = st.selectbox("Export format", list(EXPORT_FORMATS))
+    if st.button("Build Export Bundle"):
+        bundle = {}
+        for sheet_name, sheet_df in tender_sheets.items():
+            parts = prepared_sheet(sheet_df, (digest, sheet_name))[1:3]
+            for meter_type, part in zip(("NHH", "HH"), parts):
+                if part.empty:
+                    continue
+                table = stored_frame(f"{meter_type.lower()}_{sheet_name}", (digest, sheet_name))
+                if table is None:
+                    table = build_uplift_editor(part, meter_type, sheet_name)
+                bundle[f"{sheet_name}_{meter_type}"] = table
+
+        # Serialising runs on the background pool so it survives reruns
+        job_id = jobs.submit(
+            f"Uplift tables · {len(bundle)} files · {export_format}",
+            export_bundle, bundle, export_format,
+            file_name="dyce_uplift_tables.zip", mime=ZIP_MIME
+        )
+        st.session_state.setdefault("export_jobs", []).append(job_id)
+
+job_ids = jobs.session_jobs(st.session_state)
+if job_ids:
+    st.subheader("📥 Exports")
+    jobs.render_jobs(job_ids)
+
+render_panel()
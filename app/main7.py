@@ -2,8 +2,9 @@
 # Builds on V6 with HH/NHH split, horizontal uplift UI, and TAC calculation
 
 import streamlit as st
-import pandas as pd
-from io import BytesIO
+from utils.classify import hh_mask, split_hh_nhh
+from utils.file_loader import load_supplier_data
+from utils.tariff_schema import get_schema
 
 # --- Streamlit Setup ---
 st.set_page_config(layout="wide")
@@ -14,20 +15,14 @@ file = st.file_uploader("Upload Supplier Tender File (Excel)", type=["xlsx"])
 
 if file:
     sheet = st.selectbox("Select Sheet", options=["Standard", "Green"])
-    df_raw = pd.read_excel(file, sheet_name=sheet)
+    df_raw = load_supplier_data(file, sheet)
 
     # --- Detect HH ---
-    def is_hh(row):
-        return pd.notna(row.get("All Year - Day Rate (p/kWh)")) and \
-               pd.notna(row.get("All Year - Night Rate (p/kWh)")) and \
-               pd.notna(row.get("DUoS (p/KVA/Day)")) and \
-               pd.notna(row.get("Standing Charge (p/day)"))
-
-    df_raw["Is_HH"] = df_raw.apply(is_hh, axis=1)
+    hh = hh_mask(df_raw)
+    df_raw["Is_HH"] = hh
 
     # --- Split HH and NHH ---
-    df_nhh = df_raw[df_raw["Is_HH"] == False].copy()
-    df_hh = df_raw[df_raw["Is_HH"] == True].copy()
+    df_nhh, df_hh = split_hh_nhh(df_raw, hh)
 
     st.success(f"Loaded {len(df_nhh)} NHH rows and {len(df_hh)} HH rows.")
 
@@ -38,36 +33,14 @@ if file:
         base_cols = ["MPXN", "EAC"]
         data = df[base_cols].drop_duplicates().reset_index(drop=True)
 
+        schema = get_schema(meter_type)
+
         for term in terms:
             suffix = f"{term}m"
-            if meter_type == "NHH":
-                components = [
-                    (f"Standing Charge (p/day) {suffix}", 0.0),
-                    (f"SC Uplift {suffix}", 0.0),
-                    (f"Day Rate (p/kWh) {suffix}", 0.0),
-                    (f"Day Uplift {suffix}", 0.0),
-                    (f"Night Rate (p/kWh) {suffix}", 0.0),
-                    (f"Night Uplift {suffix}", 0.0),
-                    (f"E/W Rate (p/kWh) {suffix}", 0.0),
-                    (f"E/W Uplift {suffix}", 0.0),
-                    (f"TAC {suffix} (\u00a3)", 0.0)
-                ]
-            else:  # HH
-                components = [
-                    (f"Standing Charge (p/day) {suffix}", 0.0),
-                    (f"SC Uplift {suffix}", 0.0),
-                    (f"All Year - Day Rate (p/kWh) {suffix}", 0.0),
-                    (f"Day Uplift {suffix}", 0.0),
-                    (f"All Year - Night Rate (p/kWh) {suffix}", 0.0),
-                    (f"Night Uplift {suffix}", 0.0),
-                    (f"DUoS (p/KVA/Day) {suffix}", 0.0),
-                    (f"DUoS Uplift {suffix}", 0.0),
-                    (f"Metering Charge (p/day) {suffix}", 0.0),
-                    (f"Metering Uplift {suffix}", 0.0),
-                    (f"TAC {suffix} (\u00a3)", 0.0)
-                ]
-            for col, default in components:
-                data[col] = default
+            for c in schema.components:
+                data[schema.rate_column(c, term)] = 0.0
+                data[schema.uplift_column(c, term)] = 0.0
+            data[f"TAC {suffix} (\u00a3)"] = schema.tac(data, term)
 
         return data
 
@@ -2,8 +2,11 @@
 # Builds on V7 with Contract Length derivation, full TAC calculation, and correct pivoted table structure
 
 import streamlit as st
-import pandas as pd
-from io import BytesIO
+from utils.classify import hh_mask, split_hh_nhh
+from utils.contract_length import add_contract_length
+from utils.file_loader import load_supplier_data
+from utils.pivot import build_uplift_table
+from utils.tariff_schema import get_schema
 
 # --- Streamlit Setup ---
 st.set_page_config(layout="wide")
@@ -14,86 +17,26 @@ file = st.file_uploader("Upload Supplier Tender File (Excel)", type=["xlsx"])
 
 if file:
     sheet = st.selectbox("Select Sheet", options=["Standard", "Green"])
-    df_raw = pd.read_excel(file, sheet_name=sheet)
+    df_raw = load_supplier_data(file, sheet)
 
     # --- Derive Contract Length ---
-    df_raw["CSD"] = pd.to_datetime(df_raw["CSD"], dayfirst=True, errors="coerce")
-    df_raw["CED"] = pd.to_datetime(df_raw["CED"], dayfirst=True, errors="coerce")
-    df_raw["Contract Length"] = ((df_raw["CED"] - df_raw["CSD"]) / pd.Timedelta(days=365)).round().astype(int)
+    add_contract_length(df_raw)
+    priced = df_raw["Contract Length"].notna()
+    if not priced.all():
+        st.warning(f"{(~priced).sum()} rows skipped: missing dates or no matching contract term.")
 
     # --- Detect HH ---
-    def is_hh(row):
-        return pd.notna(row.get("All Year - Day Rate (p/kWh)")) and \
-               pd.notna(row.get("All Year - Night Rate (p/kWh)")) and \
-               pd.notna(row.get("DUoS (p/KVA/Day)")) and \
-               pd.notna(row.get("Standing Charge (p/day)"))
-
-    df_raw["Is_HH"] = df_raw.apply(is_hh, axis=1)
+    hh = hh_mask(df_raw)
+    df_raw["Is_HH"] = hh
 
     # --- Split HH and NHH ---
-    df_nhh = df_raw[df_raw["Is_HH"] == False].copy()
-    df_hh = df_raw[df_raw["Is_HH"] == True].copy()
+    df_nhh, df_hh = split_hh_nhh(df_raw, hh, keep=priced)
 
     st.success(f"Loaded {len(df_nhh)} NHH rows and {len(df_hh)} HH rows.")
 
     # --- Function to Build Uplift Table with TAC ---
     def build_uplift_editor(df, meter_type):
-        terms = [12, 24, 36]
-        df['EAC'] = df['EAC'].fillna(0)
-        df['Contract Length'] = df['Contract Length'].astype(str)
-
-        base_cols = ["MPXN", "EAC", "Contract Length"]
-        data = df[base_cols].drop_duplicates(subset=["MPXN", "Contract Length"]).pivot(index="MPXN", columns="Contract Length", values="EAC").reset_index()
-        data.columns.name = None
-        data = pd.merge(data, df[["MPXN", "EAC"]].drop_duplicates(), on="MPXN", how="left")
-
-        for term in terms:
-            term_str = f"{term}"
-            sub_df = df[df['Contract Length'] == term_str]
-
-            if meter_type == "NHH":
-                cost_map = sub_df.set_index("MPXN")[[
-                    "Standing Charge (p/day)",
-                    "Day Rate (p/kWh)",
-                    "Night Rate (p/kWh)",
-                    "E/W Rate (p/kWh)"
-                ]]
-                for col in cost_map.columns:
-                    data[f"{col} {term}m"] = data["MPXN"].map(cost_map[col])
-                for col in ["SC", "Day", "Night", "E/W"]:
-                    data[f"{col} Uplift {term}m"] = 0.000
-
-                tac = (
-                    data[f"Standing Charge (p/day) {term}m"] * 365 +
-                    data["EAC"] * (data[f"Day Rate (p/kWh) {term}m"] + data[f"Day Uplift {term}m"]) * 0.50 +
-                    data["EAC"] * (data[f"Night Rate (p/kWh) {term}m"] + data[f"Night Uplift {term}m"]) * 0.30 +
-                    data["EAC"] * (data[f"E/W Rate (p/kWh) {term}m"] + data[f"E/W Uplift {term}m"]) * 0.20
-                ) / 100
-                data[f"TAC {term}m (£)"] = tac.round(2)
-
-            else:
-                cost_map = sub_df.set_index("MPXN")[[
-                    "Standing Charge (p/day)",
-                    "All Year - Day Rate (p/kWh)",
-                    "All Year - Night Rate (p/kWh)",
-                    "DUoS (p/KVA/Day)",
-                    "Metering Charge (p/day)"
-                ]]
-                for col in cost_map.columns:
-                    data[f"{col} {term}m"] = data["MPXN"].map(cost_map[col])
-                for col in ["SC", "Day", "Night", "DUoS", "Metering"]:
-                    data[f"{col} Uplift {term}m"] = 0.000
-
-                tac = (
-                    data[f"Standing Charge (p/day) {term}m"] * 365 +
-                    data[f"DUoS (p/KVA/Day) {term}m"] * 365 +
-                    data[f"Metering Charge (p/day) {term}m"] * 365 +
-                    data["EAC"] * (data[f"All Year - Day Rate (p/kWh) {term}m"] + data[f"Day Uplift {term}m"]) * 0.70 +
-                    data["EAC"] * (data[f"All Year - Night Rate (p/kWh) {term}m"] + data[f"Night Uplift {term}m"]) * 0.30
-                ) / 100
-                data[f"TAC {term}m (£)"] = tac.round(2)
-
-        return data
+        return build_uplift_table(df, get_schema(meter_type), tac_label="TAC {term}m (£)")
 
     # --- Display NHH Table ---
     if not df_nhh.empty:
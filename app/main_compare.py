@@ -0,0 +1,81 @@
+# Bespoke Tool – Supplier Comparison
+# Upload tenders from several suppliers for the same portfolio; every tender is
+# priced at zero uplift and the cheapest supplier per MPXN and term is shown
+# with the margin delta to the runner-up.
+
+import streamlit as st
+from utils.comparison import compare_suppliers, supplier_name, supplier_tacs, unique_names, win_summary
+from utils.file_loader import load_tender_sheets, TENDER_SHEETS
+from utils.pipeline import TAC_LABEL
+from utils.shared_cache import SHARED, format_stats
+from utils.instrumentation import start_run, render_panel, stage
+from utils import jobs
+from utils.formatter import EXPORT_FORMATS, export_df
+
+PREVIEW_ROWS = 1_000  # Rows of the comparison shown on the page and in the export preview
+
+st.set_page_config(layout="wide")
+start_run()
+st.title("⚖️ Bespoke Power Pricing Tool – Supplier Comparison")
+
+
+# --- Background Jobs ---
+def comparison_job(frame, export_format, progress):
+    progress(0.05, f"Writing {export_format}")
+    export_data, ext, mime = export_df(frame, export_format,
+                                       progress=lambda done: progress(0.05 + 0.95 * done, f"Writing {export_format}"))
+    return export_data, frame.head(PREVIEW_ROWS), f"supplier_comparison.{ext}", mime
+
+
+# --- Upload Supplier Tenders ---
+files = st.file_uploader("Upload Supplier Tender Files (Excel)", type=["xlsx"], accept_multiple_files=True)
+sheet = st.selectbox("Select Pricing Type:", TENDER_SHEETS)
+
+if files:
+    priced = {}
+    for name, file in zip(unique_names([supplier_name(f) for f in files]), files):
+        digest, tender_sheets, _, skipped = load_tender_sheets(file)
+        if sheet in skipped:
+            st.warning(f"⚠️ {name}: {skipped[sheet]}; it is left out.")
+            continue
+        if sheet not in tender_sheets:
+            st.warning(f"{name} has no '{sheet}' sheet and is left out.")
+            continue
+        df_raw = tender_sheets[sheet]
+        # Priced once per tender/sheet for every session comparing it
+        priced[name] = SHARED.get_or_build(
+            ("supplier", digest, sheet, TAC_LABEL),
+            lambda: supplier_tacs(df_raw, cache_key=(digest, sheet))
+        )
+
+    if len(priced) < 2:
+        st.info("Upload at least two supplier tenders to compare.")
+        st.stop()
+
+    with stage("comparison", rows_in=sum(len(frame) for frame in priced.values())):
+        result = compare_suppliers(priced)
+    st.caption(f"{len(priced)} suppliers · {result['MPXN'].nunique():,} MPXNs · {len(result):,} MPXN/term rows")
+
+    st.subheader("🏆 Cheapest Supplier Summary")
+    st.dataframe(win_summary(result), use_container_width=True)
+
+    st.subheader("📋 Comparison")
+    if len(result) > PREVIEW_ROWS:
+        st.caption(f"Showing the first {PREVIEW_ROWS:,} rows; the export holds all {len(result):,}.")
+    st.dataframe(result.head(PREVIEW_ROWS), hide_index=True, use_container_width=True)
+
+    with st.sidebar:
+        st.caption(f"Shared cache: {format_stats(SHARED.stats())}")
+
+    export_format = st.selectbox("Export format", list(EXPORT_FORMATS))
+    if st.button("Export Comparison"):
+        job_id = jobs.submit(f"Supplier comparison · {len(priced)} suppliers · {export_format}",
+                             comparison_job, result, export_format)
+        st.session_state.setdefault("export_jobs", []).append(job_id)
+
+job_ids = jobs.session_jobs(st.session_state)
+if job_ids:
+    st.subheader("📥 Exports")
+    jobs.render_jobs(job_ids)
+
+render_panel()
@@ -1,21 +1,64 @@
+import re
+
+import pandas as pd
 import streamlit as st
-from st_aggrid import AgGrid, GridOptionsBuilder
+from app.utils.incremental import session_frame
+from app.utils.uplift_rules import apply_rules
+
+TERMS = ['12', '24', '36']
+TERM_TOKEN = re.compile(r'\b(\d+)m\b')
+
+
+def term_view(columns, term):
+    """Columns to show for one term: everything without a term, plus that term's columns."""
+    return [c for c in columns if TERM_TOKEN.search(c) is None or TERM_TOKEN.search(c).group(1) == term]
+
 
-def display_uplift_grid(df, sheet_type, company, reg):
-    df['Company Name'] = company
-    df['Company Reg'] = reg
-    df['Standard/Green'] = sheet_type
+def display_uplift_grid(df, sheet_type, company, reg, rules=(), page_size=None, key='uplift_grid'):
+    def build():
+        frame = df.copy()
+        frame['Company Name'] = company
+        frame['Company Reg'] = reg
+        frame['Standard/Green'] = sheet_type
+        for term in TERMS:
+            frame[f'S/C Uplift {term}m'] = 0.000
+            frame[f'Unit Rate Uplift {term}m'] = 0.000
+        # Pre-fill uplifts from bulk rules so only exceptions need typing
+        apply_rules(frame, 'STANDARD', rules, TERMS)
+        return frame
 
-    for term in ['12', '24', '36']:
-        df[f'S/C Uplift {term}m'] = 0.000
-        df[f'Unit Rate Uplift {term}m'] = 0.000
+    # The uplifted frame lives in session state, so edits survive reruns and paging;
+    # it is only rebuilt (uplifts zeroed) when the tender, customer or rules change
+    fingerprint = (sheet_type, company, reg, list(rules), len(df),
+                   int(pd.util.hash_pandas_object(df['MPXN'], index=False).sum()))
+    frame = session_frame(key, fingerprint, build)
 
     st.subheader("Enter Uplifts Per MPXN & Contract Length")
-    gb = GridOptionsBuilder.from_dataframe(df)
-    for term in ['12', '24', '36']:
-        gb.configure_column(f'S/C Uplift {term}m', type=['numericColumn'], width=100)
-        gb.configure_column(f'Unit Rate Uplift {term}m', type=['numericColumn'], width=150)
+    term = st.selectbox("Term", TERMS, format_func=lambda t: f"{t}m", key=f'{key}_term')
+
+    # Server-side paging: only this page's rows and this term's columns go to the grid
+    page_rows = slice(None)
+    page = 1
+    if page_size and len(frame) > page_size:
+        pages = -(-len(frame) // page_size)
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, key=f'{key}_page')
+        page_rows = slice((page - 1) * page_size, page * page_size)
+    columns = term_view(frame.columns, term)
+    page_df = frame.iloc[page_rows][columns].reset_index(drop=True)
+
+    from st_aggrid import AgGrid, GridOptionsBuilder  # Only pages that show the AgGrid pay for its import
+
+    gb = GridOptionsBuilder.from_dataframe(page_df)
+    gb.configure_column(f'S/C Uplift {term}m', type=['numericColumn'], width=100)
+    gb.configure_column(f'Unit Rate Uplift {term}m', type=['numericColumn'], width=150)
 
     grid_options = gb.build()
-    grid = AgGrid(df, gridOptions=grid_options, editable=True, height=500)
-    return grid['data']
+    grid = AgGrid(page_df, gridOptions=grid_options, editable=True, height=500, key=f'{key}_grid_{term}_{page}')
+
+    # Write this page's uplift edits back into the stored frame
+    edited = pd.DataFrame(grid['data'])
+    uplift_cols = [c for c in columns if ' Uplift ' in c]
+    if len(edited) == len(page_df) and set(uplift_cols) <= set(edited.columns):
+        values = edited[uplift_cols].apply(pd.to_numeric, errors='coerce').fillna(0.0).to_numpy()
+        frame.iloc[page_rows, [frame.columns.get_loc(c) for c in uplift_cols]] = values
+    return frame
@@ -0,0 +1,58 @@
+# classify.py
+# Meter classification from which rate columns are populated. Every check is a
+# whole-column mask, so classifying a tender never touches rows one at a time.
+
+import numpy as np
+import pandas as pd
+
+HH_COLUMNS = [
+    "All Year - Day Rate (p/kWh)",
+    "All Year - Night Rate (p/kWh)",
+    "DUoS (p/KVA/Day)",
+    "Standing Charge (p/day)",
+]
+
+# Checked in order: the first class whose columns are all populated wins.
+METER_CLASS_RULES = [
+    ("HH", HH_COLUMNS),
+    ("GAS", ["Gas Unit Rate (p/kWh)"]),
+    ("E/W", ["Day Rate (p/kWh)", "Night Rate (p/kWh)", "E/W Rate (p/kWh)"]),
+    ("E7", ["Day Rate (p/kWh)", "Night Rate (p/kWh)"]),
+]
+DEFAULT_CLASS = "NHH"
+
+
+def populated(df, columns):
+    """Return a boolean array: True where every column exists and is non-null."""
+    mask = np.ones(len(df), dtype=bool)
+    for col in columns:
+        if col not in df.columns:
+            return np.zeros(len(df), dtype=bool)
+        mask &= df[col].notna().to_numpy()
+    return mask
+
+
+def hh_mask(df):
+    """Vectorised replacement for the row-wise is_hh check."""
+    return populated(df, HH_COLUMNS)
+
+
+def classify_meters(df, rules=METER_CLASS_RULES, default=DEFAULT_CLASS):
+    """Return a categorical Series naming the meter class of each row."""
+    labels = [name for name, _ in rules]
+    conditions = [populated(df, columns) for _, columns in rules]
+    classes = np.select(conditions, labels, default=default) if rules else np.full(len(df), default)
+    categories = labels + [default] if default not in labels else labels
+    return pd.Series(pd.Categorical(classes, categories=categories), index=df.index, name="Meter Class")
+
+
+def split_hh_nhh(df, mask=None, keep=None):
+    """Return (nhh, hh) partitions; each is a single positional take, no extra copies.
+
+    keep is an optional boolean row mask; rows outside it go to neither partition.
+    """
+    if mask is None:
+        mask = hh_mask(df)
+    mask = np.asarray(mask, dtype=bool)
+    keep = np.ones(len(df), dtype=bool) if keep is None else np.asarray(keep, dtype=bool)
+    return df.take(np.flatnonzero(keep & ~mask)), df.take(np.flatnonzero(keep & mask))
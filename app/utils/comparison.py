@@ -0,0 +1,130 @@
+# comparison.py
+# Multi-supplier tender comparison. Each supplier's sheet is priced with the
+# usual pipeline and its TACs stacked onto an (MPXN, term) index; all
+# suppliers are then aligned column-wise on that index in one concat (a hash
+# join per supplier, no chain of pairwise merges) and ranked row-wise in NumPy.
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from .instrumentation import instrumented
+from .pipeline import METER_TYPES, TAC_LABEL, prepare_sheet, table_terms, uplift_table
+from .pivot import KEY
+
+INDEX = [KEY, "Term"]
+
+
+def supplier_name(source):
+    """Return a display name for a supplier tender: the file name without extension."""
+    name = source if isinstance(source, str) else getattr(source, "name", "Supplier")
+    return os.path.splitext(os.path.basename(name))[0]
+
+
+def mpxn_keys(values):
+    """Return MPXNs as one canonical text key, whether a sheet stored them as numbers or text.
+
+    Each supplier's keys are compacted independently (int64 or categorical), so
+    they must agree on one form before suppliers can be aligned.
+    """
+    codes, uniques = pd.factorize(pd.Series(values))
+    text = [str(int(v)) if isinstance(v, (int, float, np.integer, np.floating)) and float(v).is_integer()
+            else str(v).strip() for v in uniques.tolist()]
+    return np.append(np.array(text, dtype=object), None)[codes]
+
+
+def unique_names(names):
+    """Suffix repeated supplier names (" (2)", " (3)"...) so every column label is distinct."""
+    seen, result = {}, []
+    for name in names:
+        seen[name] = seen.get(name, 0) + 1
+        result.append(name if seen[name] == 1 else f"{name} ({seen[name]})")
+    return result
+
+
+# --- Per-supplier pricing ---
+@instrumented("supplier tac")
+def supplier_tacs(df_raw, tac_label=TAC_LABEL, cache_key=None):
+    """Return one supplier sheet's EAC and TAC on a unique (MPXN, Term) index.
+
+    Only the MPXN/term pairs the supplier actually quoted are kept; the priced
+    table zero-fills missing terms, which would otherwise look like a free quote.
+    Blank rates within a quote are priced as 0, as on the uplift pages; a pair
+    that still has no finite TAC (e.g. a blank EAC) counts as not quoted.
+    """
+    parts = []
+    for meter_type, part in zip(METER_TYPES, prepare_sheet(df_raw, cache_key=cache_key)):
+        if part.empty:
+            continue
+        table = uplift_table(part, meter_type, tac_label)
+        terms = table_terms(table, tac_label)
+        tac = table[[tac_label.format(term=term) for term in terms]].to_numpy(dtype=np.float64)
+        index = pd.MultiIndex.from_arrays([
+            np.repeat(mpxn_keys(table[KEY]), len(terms)),
+            np.tile(np.array([int(term) for term in terms], dtype=np.int16), len(table)),
+        ], names=INDEX)
+        frame = pd.DataFrame({"EAC": np.repeat(table["EAC"].to_numpy(dtype=np.float64), len(terms)),
+                              "TAC": tac.ravel()}, index=index)
+        quoted = pd.MultiIndex.from_arrays([mpxn_keys(part[KEY]), part["Contract Length"].to_numpy(dtype=np.int16)])
+        parts.append(frame[frame.index.isin(quoted) & np.isfinite(frame["TAC"].to_numpy())])
+
+    if not parts:
+        return pd.DataFrame({"EAC": [], "TAC": []}, index=pd.MultiIndex.from_arrays([[], []], names=INDEX))
+    frame = pd.concat(parts)
+    # An MPXN listed under both meter types keeps its first (NHH) quote
+    return frame[~frame.index.duplicated()]
+
+
+# --- Comparison ---
+@instrumented("compare suppliers")
+def compare_suppliers(priced):
+    """Rank suppliers per MPXN and term from {supplier: supplier_tacs() frame}.
+
+    Returns one row per quoted MPXN/term: EAC, each supplier's TAC (blank where
+    it did not quote), the number of quotes, the cheapest and runner-up supplier
+    with their TACs, and the margin delta between them in £ and %.
+    """
+    names = list(priced)
+    tacs = pd.concat([priced[name]["TAC"] for name in names], axis=1, keys=names, sort=True)
+    eac = pd.concat([priced[name]["EAC"] for name in names], axis=1, sort=True)
+    matrix = tacs.to_numpy(dtype=np.float64)
+    quotes = np.isfinite(matrix)
+
+    # Argsort with unquoted cells pushed to the end; two columns are all we need
+    ranked = np.argsort(np.where(quotes, matrix, np.inf), axis=1, kind="stable")
+    rows = np.arange(len(matrix))
+    best = ranked[:, 0]
+    second = ranked[:, 1] if len(names) > 1 else np.zeros(len(matrix), dtype=np.intp)
+    has_second = quotes.sum(axis=1) > 1
+    best_tac = matrix[rows, best]
+    second_tac = np.where(has_second, matrix[rows, second], np.nan)
+    labels = np.array(names, dtype=object)
+
+    result = pd.DataFrame({
+        KEY: tacs.index.get_level_values(KEY),
+        "Term": tacs.index.get_level_values("Term"),
+        # First supplier that quoted the pair supplies the EAC
+        "EAC": eac.bfill(axis=1).iloc[:, 0].to_numpy(),
+    })
+    for i, name in enumerate(names):
+        result[f"TAC {name} (£)"] = matrix[:, i]
+    delta = second_tac - best_tac
+    result["Quotes"] = quotes.sum(axis=1)
+    result["Cheapest Supplier"] = labels[best]
+    result["Cheapest TAC (£)"] = best_tac
+    result["Runner-up Supplier"] = np.where(has_second, labels[second], None)
+    result["Runner-up TAC (£)"] = second_tac
+    result["Margin Delta (£)"] = delta
+    result["Margin Delta (%)"] = np.round(100 * delta / np.where(best_tac > 0, best_tac, np.nan), 2)
+    return result
+
+
+def win_summary(result):
+    """Return per supplier: MPXN/terms won, total cheapest TAC and the average margin delta."""
+    summary = result.groupby("Cheapest Supplier", sort=False).agg(
+        Wins=("Cheapest TAC (£)", "size"),
+        **{"Total TAC (£)": ("Cheapest TAC (£)", "sum"),
+           "Avg Margin Delta (£)": ("Margin Delta (£)", "mean")}
+    )
+    return summary.sort_values("Wins", ascending=False).round(2)
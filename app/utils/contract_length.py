@@ -0,0 +1,85 @@
+# contract_length.py
+# Contract Length from CSD/CED as whole calendar months, computed with
+# datetime64 arithmetic over the whole column and snapped to the term
+# buckets suppliers quote. Rows with missing or unparseable dates get <NA>.
+
+import datetime
+
+import numpy as np
+import pandas as pd
+
+TERM_BUCKETS = (12, 18, 24, 36, 48, 60)
+SNAP_TOLERANCE = 1  # months either side of a bucket that still count as that bucket
+YEAR_FIRST = r"\s*\d{4}[-/.]\d{1,2}[-/.]\d{1,2}(?:[ T]|$)"  # ISO-style text dates, never day first
+
+
+def parse_dates(values):
+    """Return a column as datetime64[ns], parsing each distinct value once (bad -> NaT).
+
+    Year-first text ("2025-06-01") is read as ISO; any other text day first
+    ("01/06/2025"), with the format worked out per value.
+    """
+    values = pd.Series(values)
+    if values.dtype.kind == "M":
+        return values.to_numpy(dtype="datetime64[ns]")
+    codes, uniques = pd.factorize(values)
+    uniques = pd.Series(uniques, dtype=object)
+    text = uniques.map(lambda v: isinstance(v, str)).to_numpy(dtype=bool)
+    dates = uniques.map(lambda v: isinstance(v, (datetime.date, np.datetime64))).to_numpy(dtype=bool)
+    year_first = text & uniques.where(text, "").str.match(YEAR_FIRST).to_numpy(dtype=bool)
+
+    parsed = np.full(len(uniques) + 1, np.datetime64("NaT", "ns"))
+    for mask, dayfirst in ((year_first, False), ((text & ~year_first) | dates, True)):
+        if mask.any():
+            subset = uniques[mask].map(lambda v: v.strip() if isinstance(v, str) else v)
+            parsed[:-1][mask] = pd.to_datetime(subset, format="mixed", dayfirst=dayfirst,
+                                               errors="coerce").to_numpy(dtype="datetime64[ns]")
+    # The trailing NaT makes the factorize NA sentinel (-1) map to NaT
+    return parsed[codes]
+
+
+def month_span(start, end):
+    """Return whole calendar months from start to end inclusive (01/04/25-31/03/26 = 12), NaN for NaT."""
+    start = np.asarray(start, dtype="datetime64[D]")
+    end = np.asarray(end, dtype="datetime64[D]") + np.timedelta64(1, "D")
+    start_month = start.astype("datetime64[M]")
+    end_month = end.astype("datetime64[M]")
+    months = (end_month - start_month).astype(np.int64).astype(float)
+    # A partial final month does not count; like relativedelta, a start on the
+    # 29th-31st is clipped to the end month's last day (31/08 -> 28/02 is 6 months)
+    days_in_end_month = (end_month + np.timedelta64(1, "M")).astype("datetime64[D]") - end_month
+    start_day = np.minimum(start - start_month, days_in_end_month - np.timedelta64(1, "D"))
+    months -= (end - end_month) < start_day
+    months[np.isnat(start) | np.isnat(end)] = np.nan
+    return months
+
+
+def snap_terms(months, buckets=TERM_BUCKETS, tolerance=SNAP_TOLERANCE):
+    """Snap month spans to the nearest bucket within tolerance; others (and NaN) become NaN."""
+    months = np.asarray(months, dtype=float)
+    buckets = np.asarray(sorted(buckets), dtype=float)
+    right = np.clip(np.searchsorted(buckets, months), 1, len(buckets) - 1) if len(buckets) > 1 else np.zeros(len(months), dtype=int)
+    left = np.maximum(right - 1, 0)
+    nearest = np.where(np.abs(buckets[left] - months) <= np.abs(buckets[right] - months), buckets[left], buckets[right])
+    ok = np.abs(nearest - months) <= tolerance
+    return np.where(ok, nearest, np.nan)
+
+
+def add_contract_length(df, buckets=TERM_BUCKETS, tolerance=SNAP_TOLERANCE, cached=None):
+    """Parse CSD/CED and set Contract Length (bucketed months) in place; returns df.
+
+    cached is an optional (csd, ced, terms) tuple from a previous call (see
+    contract_columns) so reruns skip date parsing.
+    """
+    csd, ced, terms = cached if cached is not None else contract_columns(df, buckets, tolerance)
+    df["CSD"] = csd
+    df["CED"] = ced
+    df["Contract Length"] = pd.array(terms, dtype="Int16")
+    return df
+
+
+def contract_columns(df, buckets=TERM_BUCKETS, tolerance=SNAP_TOLERANCE):
+    """Return (csd, ced, terms) NumPy arrays for a tender sheet without modifying it (terms NaN = no bucket)."""
+    csd = parse_dates(df["CSD"])
+    ced = parse_dates(df["CED"])
+    return csd, ced, snap_terms(month_span(csd, ced), buckets, tolerance)
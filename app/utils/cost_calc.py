@@ -0,0 +1,84 @@
+# cost_calc.py
+# Total Annual Cost (TAC) helpers: the scalar formula plus a columnar engine
+# that prices a whole frame per term without iterating over rows.
+
+import numpy as np
+import pandas as pd
+
+DAYS_PER_YEAR = 365
+TERMS = ("12", "24", "36")
+
+
+def calculate_annual_cost(sc, unit_rate, eac):
+    """Return the annual cost in £ for one meter (pence inputs)."""
+    return round(((sc * DAYS_PER_YEAR) + (unit_rate * eac)) / 100, 2)
+
+
+# --- Columnar engine ---
+def as_float(values):
+    """Return a Series/array as a float64 NumPy array (non-numeric -> NaN)."""
+    if getattr(values, "dtype", None) == np.float64:
+        return np.asarray(values)
+    return pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def round_exact(values, decimals):
+    """np.round that agrees with Python's round() on values that sit on a half tie.
+
+    np.round scales by 10**decimals first, which can push e.g. 36290.975 (stored
+    just below .975) onto an exact .5 and round it up; those few near-ties are
+    re-rounded with round() so the columnar and scalar paths match exactly.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    out = np.round(values, decimals)
+    scaled = values * 10 ** decimals
+    near_tie = np.flatnonzero(np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6)
+    if len(near_tie):
+        out[near_tie] = [round(v, decimals) for v in values[near_tie].tolist()]
+    return out
+
+
+def column_or_zero(df, col):
+    """Return a column as float64, or zeros when the column is missing (mirrors row.get(col, 0))."""
+    if col not in df.columns:
+        return np.zeros(len(df))
+    return as_float(df[col])
+
+
+def build_broker_output(df, base_cols, schema, terms=TERMS, cost_label="TAC {term}m (£)"):
+    """Build the broker output table with one columnar pass per term.
+
+    base_cols maps output column -> source column and is copied through as-is.
+    Each term adds every schema component's uplifted rate and the annual cost.
+    """
+    out = pd.DataFrame({name: df[src].to_numpy() for name, src in base_cols.items()})
+
+    for term in terms:
+        for c in schema.components:
+            rate = column_or_zero(df, schema.rate_column(c, term)) + column_or_zero(df, schema.uplift_column(c, term))
+            out[f"{c.name} {term}m ({c.unit})"] = round_exact(rate, 3)
+        out[cost_label.format(term=term)] = schema.tac(df, term)
+
+    return out
+
+
+def weighted_tac(df, term, per_day, per_kwh, eac_col="EAC"):
+    """Vectorised TAC for multi-rate meters on the wide per-MPXN table.
+
+    per_day: [(rate_col, uplift_name)] charged every day of the year.
+    per_kwh: [(rate_col, uplift_name, weight)] charged on a share of EAC.
+    Columns are looked up as "{rate_col} {term}m" / "{uplift_name} Uplift {term}m";
+    missing columns count as zero.
+    """
+    eac = as_float(df[eac_col])
+    total = np.zeros(len(df))
+
+    for rate_col, uplift in per_day:
+        rate = column_or_zero(df, f"{rate_col} {term}m") + column_or_zero(df, f"{uplift} Uplift {term}m")
+        total = total + rate * DAYS_PER_YEAR
+
+    for rate_col, uplift, weight in per_kwh:
+        rate = column_or_zero(df, f"{rate_col} {term}m") + column_or_zero(df, f"{uplift} Uplift {term}m")
+        total = total + eac * rate * weight
+
+    return round_exact(total / 100, 2)
@@ -0,0 +1,87 @@
+# dtypes.py
+# Compact storage for tender frames held in session state: integer or
+# categorical MPXN keys and int8 contract terms. Rates, uplifts, EAC and TAC
+# stay float64: float32 cannot hold 3 dp rates exactly, and those errors reach
+# both the TACs and the exported workbooks.
+
+import numpy as np
+import pandas as pd
+
+
+def frame_memory(df):
+    """Return a frame's memory footprint in bytes (object columns measured deeply)."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def format_bytes(n):
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+def session_memory(state):
+    """Return total bytes of the DataFrames held in a mapping such as st.session_state."""
+    return sum(frame_memory(value) for value in list(state.values()) if isinstance(value, pd.DataFrame))
+
+
+# --- Column converters ---
+def compact_key(values):
+    """Return MPXNs as int64 when the sheet stored them as numbers, else as a categorical.
+
+    Text MPXNs stay text (categorical), so they are exported as text and 13-digit
+    MPANs never turn into numbers that Excel shows in scientific notation.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values
+    if values.dtype.kind in "iu":
+        return values.astype(np.int64)
+    if values.dtype.kind == "f":
+        if values.notna().all() and (values == np.trunc(values)).all() and values.abs().max() < 2 ** 53:
+            return values.astype(np.int64)
+        return values
+    return values.astype("category")
+
+
+def compact_term(values):
+    """Return contract terms (e.g. "12", 24.0) as int8 months, or the values unchanged if any don't fit."""
+    numeric = pd.to_numeric(values, errors="coerce")
+    if numeric.isna().any() or (numeric != np.trunc(numeric)).any() or numeric.abs().max() > 127:
+        return values
+    return numeric.astype(np.int8)
+
+
+def as_float64(values, fill=None):
+    """Return a numeric column as float64 (non-numeric -> NaN), optionally NaN-filled."""
+    values = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64)
+    if fill is not None:
+        values = np.where(np.isnan(values), fill, values)
+    return values
+
+
+# --- Frames ---
+def compact_table(table, key="MPXN", fill=None):
+    """Return a compacted copy of a wide uplift table in a single column-by-column pass.
+
+    The MPXN key is compacted and numeric columns are float64. fill replaces
+    blanks while casting, so no separate fillna(0) copy of the whole frame is needed.
+    """
+    columns = {}
+    for col in table.columns:
+        values = table[col]
+        if col == key:
+            columns[col] = compact_key(values)
+        elif values.dtype.kind not in "fiu":
+            columns[col] = values
+        else:
+            columns[col] = as_float64(values, fill)
+    return pd.DataFrame(columns, index=table.index)
+
+
+def compact_tender(df, key="MPXN", term_col="Contract Length"):
+    """Compact a long tender sheet in place: MPXN keys and Contract Length; returns df."""
+    if key in df.columns:
+        df[key] = compact_key(df[key])
+    if term_col in df.columns:
+        df[term_col] = compact_term(df[term_col])
+    return df
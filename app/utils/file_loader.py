@@ -0,0 +1,284 @@
+# file_loader.py
+# Tender ingestion: hash the uploaded bytes, parse every sheet once and keep
+# the parsed frames on disk (Parquet) so reruns and re-uploads skip openpyxl.
+
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+import xml.etree.ElementTree as ET
+import zipfile
+from io import BytesIO
+
+import pandas as pd
+
+from .ingest import CHUNKED_MIN_BYTES, read_workbook_chunked
+from .instrumentation import row_count, stage
+from .shared_cache import SHARED, view
+from .tender_columns import MissingColumnsError, column_dtypes, mpxn_values, validate_header
+
+CACHE_DIR = os.environ.get("BESPOKE_CACHE_DIR", ".tender_cache")
+CACHE_MAX_BYTES = int(os.environ.get("BESPOKE_CACHE_MB", "512")) * 1024 * 1024
+MANIFEST = "manifest.json"
+# Bump whenever a parser's output changes (columns kept, dtypes, header validation):
+# entries are keyed by it, so stale frames are never served and simply age out
+CACHE_SCHEMA = 4
+TENDER_SHEETS = ("Standard", "Green")
+
+
+# --- Hashing ---
+def read_bytes(source):
+    """Return the raw bytes of an upload, a path or any file-like object."""
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as fh:
+            return fh.read()
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+    source.seek(0)
+    data = source.read()
+    source.seek(0)
+    return data
+
+
+def file_hash(data):
+    """Return a short content hash used as the cache key."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def upload_key(source):
+    """Return an identity for a Streamlit upload that is stable across reruns, or None for other sources."""
+    file_id = getattr(source, "file_id", None)
+    return None if file_id is None else (file_id, getattr(source, "size", None))
+
+
+# --- Disk cache ---
+def _entry_dir(digest):
+    return os.path.join(CACHE_DIR, f"{digest}.v{CACHE_SCHEMA}")
+
+
+def _entry_size(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def _write_frame(frame, path_stem):
+    """Write one sheet as Parquet, falling back to pickle for mixed-type columns."""
+    try:
+        frame.to_parquet(path_stem + ".parquet", index=False)
+        return os.path.basename(path_stem) + ".parquet"
+    except (ImportError, ValueError, TypeError):
+        frame.to_pickle(path_stem + ".pkl")
+        return os.path.basename(path_stem) + ".pkl"
+
+
+def _read_frame(path):
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+
+def read_cached(digest):
+    """Return ({sheet: DataFrame}, {sheet: seconds}, {sheet: MissingColumnsError}) for a cached tender, or None on a miss."""
+    entry = _entry_dir(digest)
+    manifest_path = os.path.join(entry, MANIFEST)
+    if not os.path.exists(manifest_path):
+        return None
+
+    with open(manifest_path, encoding="utf-8") as fh:
+        manifest = json.load(fh)
+    if manifest.get("schema") != CACHE_SCHEMA:
+        return None
+    sheets, timings = {}, {}
+    for sheet, name in manifest["sheets"].items():
+        start = time.perf_counter()
+        sheets[sheet] = _read_frame(os.path.join(entry, name))
+        timings[sheet] = time.perf_counter() - start
+
+    skipped = {sheet: MissingColumnsError(sheet, missing) for sheet, missing in manifest.get("skipped", {}).items()}
+
+    # Touch the entry so eviction treats it as recently used
+    os.utime(entry)
+    return sheets, timings, skipped
+
+
+def write_cached(digest, sheets, parser=None, skipped=None):
+    """Persist parsed sheets for a tender, then trim the cache to its size budget.
+
+    The manifest records the cache schema, which parser produced the frames and
+    the missing columns of any sheet that was skipped.
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    entry = _entry_dir(digest)
+    tmp = f"{entry}.tmp-{uuid.uuid4().hex}"
+    os.makedirs(tmp)
+
+    manifest = {"schema": CACHE_SCHEMA, "parser": parser, "sheets": {},
+                "skipped": {sheet: error.missing for sheet, error in (skipped or {}).items()}}
+    for i, (sheet, frame) in enumerate(sheets.items()):
+        manifest["sheets"][sheet] = _write_frame(frame, os.path.join(tmp, f"sheet{i}"))
+    with open(os.path.join(tmp, MANIFEST), "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh)
+
+    # Rename into place so readers never see a half-written entry
+    try:
+        os.rename(tmp, entry)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    evict(CACHE_MAX_BYTES)
+
+
+def evict(max_bytes):
+    """Delete least recently used entries until the cache fits in max_bytes."""
+    if not os.path.isdir(CACHE_DIR):
+        return
+
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        path = os.path.join(CACHE_DIR, name)
+        if os.path.isdir(path) and ".tmp-" not in name:
+            entries.append((os.path.getmtime(path), _entry_size(path), path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+
+
+# --- Workbook parsing ---
+def excel_engine():
+    """Return the fastest installed Excel engine: calamine when present, else openpyxl."""
+    try:
+        import python_calamine  # noqa: F401
+        return "calamine"
+    except ImportError:
+        return "openpyxl"
+
+
+def read_workbook(data, sheets=None):
+    """Open a workbook once and parse the requested sheets (all when None).
+
+    Each sheet's header row is read first and validated; a sheet missing
+    required columns (e.g. a blank Green sheet) is skipped before any of its
+    rows are parsed. Then only the columns the pipeline uses are loaded,
+    numeric ones with explicit float dtypes. Returns ({sheet: DataFrame},
+    {sheet: seconds}, {sheet: MissingColumnsError}).
+    """
+    frames, timings, skipped = {}, {}, {}
+    with pd.ExcelFile(BytesIO(data), engine=excel_engine()) as xl:
+        names = xl.sheet_names if sheets is None else [s for s in sheets if s in xl.sheet_names]
+        for name in names:
+            start = time.perf_counter()
+            try:
+                columns = validate_header(xl.parse(name, nrows=0).columns, name)
+            except MissingColumnsError as e:
+                skipped[name] = e
+                continue
+            dtypes = column_dtypes(columns)
+            try:
+                frame = xl.parse(name, usecols=columns, dtype=dtypes)
+            except ValueError:
+                # Text such as "N/A" in a rate column: parse this sheet again untyped and coerce
+                numeric = [col for col, dtype in dtypes.items() if dtype == "float64"]
+                frame = xl.parse(name, usecols=columns, dtype={col: object for col in dtypes})
+                for col in numeric:
+                    frame[col] = pd.to_numeric(frame[col], errors="coerce")
+            frame["MPXN"] = mpxn_values(frame["MPXN"])
+            frames[name] = frame.infer_objects()
+            timings[name] = time.perf_counter() - start
+    return frames, timings, skipped
+
+
+def parse_workbook(data, sheets=None):
+    """Parse with the chunked process-pool reader for large files, else read_workbook.
+
+    Returns ({sheet: DataFrame}, {sheet: seconds}, {sheet: MissingColumnsError}, parser name).
+    """
+    if len(data) >= CHUNKED_MIN_BYTES:
+        try:
+            return read_workbook_chunked(data, sheets) + ("chunked",)
+        except (KeyError, ValueError, ET.ParseError, zipfile.BadZipFile):
+            pass  # Unusual xlsx layout (e.g. ingest.SheetLayoutError on prefixed XML): fall back to openpyxl
+    return read_workbook(data, sheets) + ("workbook",)
+
+
+# --- Public loaders ---
+def load_tender(source, sheets=TENDER_SHEETS, digests=None):
+    """Return (digest, {sheet: DataFrame}, {sheet: seconds}, {sheet: MissingColumnsError}).
+
+    The workbook is parsed at most once, and only its tender sheets. A sheet
+    missing required columns is skipped straight after its header row is read
+    and reported in the last dict, so one bad sheet never fails the upload.
+
+    digests is an optional dict kept across reruns (e.g. in st.session_state)
+    that remembers each upload's hash, so a rerun on the same upload neither
+    reads nor hashes its bytes again while the frames are cached.
+
+    Frames come from the process-wide cache when another session already loaded
+    the same file; they are shallow views, so treat them as read-only.
+    """
+    with stage("load") as record:
+        key = upload_key(source) if digests is not None else None
+        data, digest = None, digests.get(key) if key is not None else None
+        if digest is None:
+            data = read_bytes(source)
+            digest = file_hash(data)
+            if key is not None:
+                digests[key] = digest
+
+        shared = SHARED.get(("tender", digest))
+        if shared is not None:
+            frames, skipped = shared
+            record["source"] = "memory"
+            record["rows_out"] = row_count(frames)
+            return digest, frames, {sheet: 0.0 for sheet in frames}, skipped
+
+        cached = read_cached(digest)
+        if cached is not None:
+            record["source"] = "disk"
+            frames, timings, skipped = cached
+        else:
+            record["source"] = "workbook"
+            frames, timings, skipped, parser = parse_workbook(read_bytes(source) if data is None else data, sheets)
+            try:
+                write_cached(digest, frames, parser, skipped)
+            except OSError:
+                pass  # A read-only or full disk only costs us the cache
+
+        SHARED.put(("tender", digest), (frames, skipped))
+        record["rows_out"] = row_count(frames)
+        return digest, view(frames), timings, skipped
+
+
+def load_tender_sheets(source, sheets=TENDER_SHEETS, digests=None):
+    """Return (digest, {sheet: DataFrame}, {sheet: seconds}, {sheet: MissingColumnsError}) for the Standard and Green sheets."""
+    digest, frames, timings, skipped = load_tender(source, digests=digests)
+    return (
+        digest,
+        {name: frames[name] for name in sheets if name in frames},
+        {name: timings[name] for name in sheets if name in timings},
+        {name: skipped[name] for name in sheets if name in skipped},
+    )
+
+
+def format_timings(timings):
+    """Return a one-line summary such as "Standard 1.20s · Green 0.95s"."""
+    return " · ".join(f"{sheet} {seconds:.2f}s" for sheet, seconds in timings.items())
+
+
+def format_skipped(skipped):
+    """Return one message per skipped sheet, e.g. "Sheet 'Green' is missing required column(s): MPXN; it was skipped"."""
+    return [f"{error}; it was skipped" for error in skipped.values()]
+
+
+def load_supplier_data(uploaded_file, sheet_name):
+    """Return one sheet of a supplier tender, raising MissingColumnsError if that sheet was skipped."""
+    _, sheets, _, skipped = load_tender(uploaded_file)
+    if sheet_name in skipped:
+        raise skipped[sheet_name]
+    return sheets[sheet_name]
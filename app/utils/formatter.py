@@ -0,0 +1,171 @@
+# formatter.py
+# Broker output export. Rows are streamed into xlsxwriter in constant_memory
+# mode from column arrays, one chunk at a time, with number formats applied
+# per column rather than per cell. CSV, Parquet and zipped bundles skip the
+# xlsx serialisation cost entirely for downstream systems that don't need it.
+# preprocess_dataframe shapes a raw Standard sheet for the layout.py flow.
+
+import zipfile
+from io import BytesIO
+
+import numpy as np
+
+from .contract_length import add_contract_length
+from .cost_calc import TERMS
+from .instrumentation import instrumented
+from .pivot import KEY, build_uplift_table
+from .tariff_schema import get_schema
+
+CHUNK_ROWS = 5_000
+RATE_FORMAT = "0.000"          # p/kWh, p/day, p/kVA/day
+MONEY_FORMAT = "£#,##0.00"     # TAC / annual cost
+DATE_FORMAT = "dd/mm/yyyy"
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+CSV_MIME = "text/csv"
+PARQUET_MIME = "application/vnd.apache.parquet"
+ZIP_MIME = "application/zip"
+
+
+# --- Input shaping ---
+def preprocess_dataframe(df, terms=TERMS):
+    """Return the per-MPXN Standard table (rates, uplifts, TAC per term) with each MPXN's first CSD.
+
+    Rows whose dates don't snap to one of terms are dropped.
+    """
+    df = add_contract_length(df.copy(deep=False))
+    df = df[df["Contract Length"].isin([int(term) for term in terms])]
+    table = build_uplift_table(df, get_schema("STANDARD"), terms=terms)
+    first_csd = df.drop_duplicates(subset=[KEY]).set_index(KEY)["CSD"]
+    table.insert(1, "CSD", table[KEY].map(first_csd))
+    return table
+
+
+# --- xlsx ---
+def number_format(column):
+    """Return the Excel number format for a column based on its unit label."""
+    name = str(column)
+    if "(£)" in name or name.startswith("TAC"):
+        return MONEY_FORMAT
+    if "(p/" in name:
+        return RATE_FORMAT
+    return None
+
+
+def _chunk_values(series):
+    """Return a column slice as a list of plain Python values with None for blanks."""
+    values = series.to_numpy()
+    if values.dtype.kind == "f":
+        blank = np.isnan(values)
+        out = values.tolist()
+        for i in np.flatnonzero(blank):
+            out[i] = None
+        return out
+    if values.dtype.kind in "iub":
+        return values.tolist()
+    # Objects, strings and datetimes: NaN/NaT become blank cells
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def convert_df(df, sheet_name="Broker Output", chunk_rows=CHUNK_ROWS, progress=None):
+    """Return the frame as an xlsx file (BytesIO) written in constant-memory mode.
+
+    progress, if given, is called with the fraction of rows written after each chunk.
+    """
+    import xlsxwriter
+
+    output = BytesIO()
+    workbook = xlsxwriter.Workbook(output, {
+        "constant_memory": True,
+        "default_date_format": DATE_FORMAT,
+    })
+    worksheet = workbook.add_worksheet(sheet_name)
+
+    header = workbook.add_format({"bold": True})
+    formats = {fmt: workbook.add_format({"num_format": fmt}) for fmt in (RATE_FORMAT, MONEY_FORMAT)}
+    for i, column in enumerate(df.columns):
+        fmt = number_format(column)
+        worksheet.set_column(i, i, max(12, min(len(str(column)) + 2, 40)), formats.get(fmt))
+
+    # constant_memory requires rows in order, so write the header then each chunk
+    worksheet.write_row(0, 0, [str(c) for c in df.columns], header)
+    row = 1
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        columns = [_chunk_values(chunk.iloc[:, j]) for j in range(chunk.shape[1])]
+        for values in zip(*columns):
+            worksheet.write_row(row, 0, values)
+            row += 1
+        if progress is not None:
+            progress(row / max(len(df), 1))
+
+    workbook.close()
+    output.seek(0)
+    return output
+
+
+# --- Fast alternative formats ---
+def _arrow_table(df):
+    """Return a pyarrow Table, stringifying mixed-type object columns Arrow rejects."""
+    import pyarrow as pa
+
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        mixed = {c: df[c].astype("string") for c in df.columns if df[c].dtype == object}
+        return pa.Table.from_pandas(df.assign(**mixed), preserve_index=False)
+
+
+def to_csv_bytes(df, progress=None):
+    """Return the frame as CSV bytes, via Arrow's C++ writer when pyarrow is installed."""
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+    except ImportError:
+        return df.to_csv(index=False).encode("utf-8")
+
+    sink = pa.BufferOutputStream()
+    pacsv.write_csv(_arrow_table(df), sink)
+    return sink.getvalue().to_pybytes()
+
+
+def to_parquet_bytes(df, progress=None):
+    """Return the frame as Parquet bytes (requires pyarrow)."""
+    import pyarrow.parquet as pq
+
+    output = BytesIO()
+    pq.write_table(_arrow_table(df), output)
+    return output.getvalue()
+
+
+def to_xlsx_bytes(df, progress=None):
+    return convert_df(df, progress=progress).getvalue()
+
+
+# label -> (file extension, mime type, writer)
+EXPORT_FORMATS = {
+    "Excel (.xlsx)": ("xlsx", XLSX_MIME, to_xlsx_bytes),
+    "CSV (.csv)": ("csv", CSV_MIME, to_csv_bytes),
+    "Parquet (.parquet)": ("parquet", PARQUET_MIME, to_parquet_bytes),
+}
+
+
+@instrumented("export")
+def export_df(df, fmt, progress=None):
+    """Return (bytes, extension, mime) for one frame in an EXPORT_FORMATS format."""
+    ext, mime, writer = EXPORT_FORMATS[fmt]
+    return writer(df, progress=progress), ext, mime
+
+
+@instrumented("export")
+def export_bundle(frames, fmt, progress=None):
+    """Return zip bytes with one file per named frame, e.g. {"Standard_NHH": df, ...}."""
+    ext, _, writer = EXPORT_FORMATS[fmt]
+    # xlsx and Parquet are already compressed; only CSV benefits from deflate
+    compression = zipfile.ZIP_DEFLATED if ext == "csv" else zipfile.ZIP_STORED
+    output = BytesIO()
+    with zipfile.ZipFile(output, "w", compression=compression) as bundle:
+        for i, (name, frame) in enumerate(frames.items()):
+            bundle.writestr(f"{name}.{ext}", writer(frame))
+            if progress is not None:
+                progress((i + 1) / len(frames))
+    return output.getvalue()
@@ -0,0 +1,137 @@
+# incremental.py
+# Session-state backed uplift editing: edits from st.data_editor are written
+# into the stored per-MPXN frame and only the touched MPXN/term TACs are
+# recomputed, so edit-to-refresh cost does not grow with the portfolio.
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+
+# --- Pure recompute logic ---
+def tac_dependencies(columns, schema, tac_label):
+    """Return ({input column: term}, {term: TAC column}) for a wide uplift frame.
+
+    EAC feeds every term and is mapped to None.
+    """
+    deps, tac_cols = {"EAC": None}, {}
+    for col in columns:
+        for c in schema.components:
+            for suffix in (f"{c.column} ", f"{c.uplift} Uplift "):
+                if col.startswith(suffix) and col.endswith("m"):
+                    term = col[len(suffix):-1]
+                    if tac_label.format(term=term) in columns:
+                        deps[col] = term
+    for term in set(t for t in deps.values() if t is not None):
+        tac_cols[term] = tac_label.format(term=term)
+    return deps, tac_cols
+
+
+def recompute_tac(frame, rows, terms, schema, tac_cols):
+    """Recompute TAC in place for the given row positions and terms only."""
+    if not rows:
+        return
+    rows = np.asarray(sorted(rows))
+    subset = frame.iloc[rows]
+    for term in terms:
+        col = frame.columns.get_loc(tac_cols[term])
+        frame.iloc[rows, col] = schema.tac(subset, term)
+
+
+def apply_edits(frame, delta, schema, tac_label, columns_map=None):
+    """Apply a data_editor delta to frame and refresh only the affected TACs.
+
+    delta is the editor's session-state value ({"edited_rows", "added_rows",
+    "deleted_rows"}); columns_map maps displayed names back to frame columns.
+    Returns (frame, touched) where touched is a set of (row, term) pairs.
+    """
+    columns_map = columns_map or {}
+    deps, tac_cols = tac_dependencies(list(frame.columns), schema, tac_label)
+    touched = set()
+
+    for row, changes in delta.get("edited_rows", {}).items():
+        row = int(row)
+        for shown, value in changes.items():
+            col = columns_map.get(shown, shown)
+            if col not in frame.columns:
+                continue
+            frame.iloc[row, frame.columns.get_loc(col)] = value
+            if col in deps:
+                terms = tac_cols if deps[col] is None else [deps[col]]
+                touched.update((row, term) for term in terms)
+
+    _reprice(frame, touched, schema, tac_cols)
+
+    deleted = delta.get("deleted_rows", [])
+    added = delta.get("added_rows", [])
+    if deleted or added:
+        # Structural edits shift row positions, so rebuild the frame and price just the new rows
+        kept = frame.drop(index=frame.index[deleted]).reset_index(drop=True)
+        new_rows = pd.DataFrame([{columns_map.get(k, k): v for k, v in row.items()} for row in added],
+                                columns=frame.columns)
+        new_rows = new_rows.fillna({col: 0.0 for col in frame.columns if "Uplift" in col})
+        frame = pd.concat([kept, new_rows], ignore_index=True)
+        appended = {(len(kept) + i, term) for i in range(len(new_rows)) for term in tac_cols}
+        _reprice(frame, appended, schema, tac_cols)
+        touched |= appended
+
+    return frame, touched
+
+
+def _reprice(frame, touched, schema, tac_cols):
+    by_term = {}
+    for row, term in touched:
+        by_term.setdefault(term, set()).add(row)
+    for term, rows in by_term.items():
+        recompute_tac(frame, rows, [term], schema, tac_cols)
+
+
+# --- Streamlit glue ---
+def stored_frame(key, fingerprint):
+    """Return the priced frame an incremental_editor holds for key, or None if stale/absent."""
+    if st.session_state.get(f"{key}_fingerprint") != fingerprint:
+        return None
+    return st.session_state.get(f"{key}_frame")
+
+
+def session_frame(key, fingerprint, build_frame):
+    """Return the session's priced frame for key, building it when fingerprint changes."""
+    if st.session_state.get(f"{key}_fingerprint") != fingerprint:
+        st.session_state[f"{key}_frame"] = build_frame()
+        st.session_state[f"{key}_fingerprint"] = fingerprint
+        st.session_state[f"{key}_version"] = 0
+    return st.session_state[f"{key}_frame"]
+
+
+def replace_frame(key, fingerprint, frame):
+    """Swap in a whole new frame (e.g. after bulk rules) and reset the editor's delta."""
+    st.session_state[f"{key}_frame"] = frame
+    st.session_state[f"{key}_fingerprint"] = fingerprint
+    st.session_state[f"{key}_version"] = st.session_state.get(f"{key}_version", 0) + 1
+
+
+def incremental_editor(key, fingerprint, build_frame, schema, tac_label, rename=None, **editor_kwargs):
+    """Render a data_editor whose TAC columns refresh incrementally and return the current frame.
+
+    build_frame() is only called when fingerprint (e.g. file hash + sheet) changes;
+    afterwards the priced frame lives in st.session_state and each edit patches it.
+    """
+    frame_key, version_key = f"{key}_frame", f"{key}_version"
+    frame = session_frame(key, fingerprint, build_frame)
+    shown = frame.rename(columns=rename) if rename else frame
+    columns_map = dict(zip(shown.columns, frame.columns))
+    editor_key = f"{key}_editor_{st.session_state[version_key]}"
+
+    def _on_change():
+        updated, _ = apply_edits(st.session_state[frame_key], st.session_state[editor_key],
+                                 schema, tac_label, columns_map)
+        st.session_state[frame_key] = updated
+        # A fresh widget key hands the editor the patched frame with an empty delta.
+        # Trade-off: the editor remounts, so its scroll position and focused cell
+        # reset after each edit. A stable key would keep them, but the editor would
+        # then replay its accumulated delta on top of the already patched frame.
+        st.session_state[version_key] += 1
+
+    tac_shown = [name for name, col in columns_map.items() if col.startswith("TAC")]
+    st.data_editor(shown, key=editor_key, on_change=_on_change, disabled=tac_shown, **editor_kwargs)
+    return st.session_state[frame_key]
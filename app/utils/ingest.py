@@ -0,0 +1,271 @@
+# ingest.py
+# Chunked parallel ingestion for very large tenders. The sheet XML is streamed
+# out of the xlsx zip and cut into blocks of whole <row> elements; a process
+# spawned process pool parses, selects and types each block (cell values,
+# dates, Contract Length, Is_HH) and the typed chunks are concatenated in
+# order. Only a few raw blocks are in flight at once, so parse memory follows
+# the chunk size.
+
+import multiprocessing
+import os
+import posixpath
+import re
+import time
+import xml.etree.ElementTree as ET
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from .classify import hh_mask
+from .contract_length import add_contract_length, parse_dates
+from .tender_columns import DATE_COLUMNS, MissingColumnsError, mpxn_values, validate_header
+
+CHUNK_BYTES = int(os.environ.get("BESPOKE_CHUNK_MB", "8")) * 1024 * 1024
+CHUNKED_MIN_BYTES = int(os.environ.get("BESPOKE_CHUNKED_MB", "10")) * 1024 * 1024  # xlsx size to switch modes
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+EXCEL_EPOCH = "1899-12-30"
+CELL_REF = re.compile(r"([A-Z]+)")
+
+_strings = []  # shared strings table, set once per worker process
+
+
+class SheetLayoutError(ValueError):
+    """The sheet XML is not laid out the way the chunked reader expects (e.g. prefixed tags)."""
+
+
+# --- Workbook structure ---
+def sheet_members(zf):
+    """Return {sheet name: zip member path} from workbook.xml and its relationships."""
+    workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+    rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    targets = {rel.get("Id"): rel.get("Target") for rel in rels}
+    members = {}
+    for sheet in workbook.iter(f"{{{MAIN_NS}}}sheet"):
+        target = targets[sheet.get(f"{{{REL_NS}}}id")]
+        members[sheet.get("name")] = target.lstrip("/") if target.startswith("/") else posixpath.join("xl", target)
+    return members
+
+
+def shared_strings(zf):
+    """Return the shared strings table as a list (rich text runs joined)."""
+    if "xl/sharedStrings.xml" not in zf.namelist():
+        return []
+    strings = []
+    with zf.open("xl/sharedStrings.xml") as fh:
+        for _, elem in ET.iterparse(fh):
+            if elem.tag == f"{{{MAIN_NS}}}si":
+                strings.append("".join(t.text or "" for t in elem.iter(f"{{{MAIN_NS}}}t")))
+                elem.clear()
+    return strings
+
+
+def iter_row_blocks(zf, member, chunk_bytes=CHUNK_BYTES):
+    """Yield bytes blocks of whole <row> elements, streamed from the sheet XML.
+
+    Raises SheetLayoutError when there is no plain <sheetData> element, e.g. when
+    the writer used a namespace prefix (<x:sheetData>).
+    """
+    buffer = b""
+    started = False
+    with zf.open(member) as fh:
+        while True:
+            data = fh.read(chunk_bytes)
+            buffer += data
+            if not started:
+                start = buffer.find(b"<sheetData>")
+                if start < 0:
+                    if b"<sheetData/>" in buffer:
+                        return  # Empty sheet
+                    if not data:
+                        raise SheetLayoutError(f"{member}: no <sheetData> element")
+                    continue
+                buffer, started = buffer[start + len(b"<sheetData>"):], True
+            end = buffer.find(b"</sheetData>")
+            if end >= 0:
+                if buffer[:end].strip():
+                    yield buffer[:end]
+                return
+            cut = buffer.rfind(b"</row>")
+            if cut >= 0 and (len(buffer) >= chunk_bytes or not data):
+                cut += len(b"</row>")
+                yield buffer[:cut]
+                buffer = buffer[cut:]
+            if not data:
+                return
+
+
+# --- Block parsing (runs in the worker processes) ---
+def _column_index(ref):
+    letters = CELL_REF.match(ref).group(1)
+    index = 0
+    for ch in letters:
+        index = index * 26 + ord(ch) - 64
+    return index - 1
+
+
+def parse_block(block, strings=None):
+    """Return (first row number, rows) for an XML block, rows as lists of Python values (None for blanks).
+
+    Excel leaves blank rows out of the XML, so each gap inside the block comes
+    back as an empty row and positions match the openpyxl reader; blank rows
+    after the block's last value are dropped, as openpyxl's trailing ones are.
+    """
+    strings = _strings if strings is None else strings
+    root = ET.fromstring(b'<sheetData xmlns="' + MAIN_NS.encode() + b'">' + block + b"</sheetData>")
+    first, number, rows = None, 0, []
+    for row in root:
+        number = int(row.get("r", number + 1))
+        values = []
+        for cell in row:
+            ref = cell.get("r")
+            col = _column_index(ref) if ref else len(values)
+            if col > len(values):
+                values.extend([None] * (col - len(values)))
+            kind = cell.get("t", "n")
+            v = cell.find(f"{{{MAIN_NS}}}v")
+            if kind == "inlineStr":
+                value = "".join(t.text or "" for t in cell.iter(f"{{{MAIN_NS}}}t"))
+            elif v is None or v.text is None:
+                value = None
+            elif kind == "s":
+                value = strings[int(v.text)]
+            elif kind == "n":
+                value = float(v.text)
+            elif kind == "b":
+                value = v.text == "1"
+            elif kind == "e":
+                value = None
+            else:  # "str" (formula result) and anything else textual
+                value = v.text
+            values.append(value)
+        if all(value is None or value == "" for value in values):
+            continue
+        if first is None:
+            first = number
+        rows.extend([] for _ in range(number - first - len(rows)))
+        rows.append(values)
+    return first, rows
+
+
+def _excel_number(value):
+    # Whole numbers as int and blanks as NaN, as read_workbook's MPXN cells come back
+    if value is None:
+        return np.nan
+    return int(value) if isinstance(value, float) and value.is_integer() else value
+
+
+def type_chunk(rows, header, columns):
+    """Build one typed chunk: selected columns, numeric rates, parsed dates, Contract Length, Is_HH.
+
+    MPXN is left as the cell values (text stays text, e.g. "0123"); the caller
+    types it with mpxn_values() once all chunks are joined.
+    """
+    width = len(header)
+    rows = [r[:width] + [None] * (width - len(r)) for r in rows]
+    frame = pd.DataFrame(rows, columns=header, dtype=object)[columns]
+    for col in columns:
+        values = frame[col]
+        if col in DATE_COLUMNS:
+            numeric = pd.to_numeric(values, errors="coerce")
+            # Excel stores real dates as serial numbers; text dates go through the usual parser
+            serial = pd.to_datetime(numeric, unit="D", origin=EXCEL_EPOCH, errors="coerce").to_numpy(dtype="datetime64[ns]")
+            text = parse_dates(values.where(numeric.isna()))
+            frame[col] = np.where(np.isnat(serial), text, serial)
+        elif col == "MPXN":
+            frame[col] = values.map(_excel_number)
+        else:
+            frame[col] = pd.to_numeric(values, errors="coerce")
+    if all(col in frame.columns for col in DATE_COLUMNS):
+        add_contract_length(frame)
+    frame["Is_HH"] = hh_mask(frame)
+    return frame
+
+
+def _init_worker(strings):
+    global _strings
+    _strings = strings
+
+
+def _parse_and_type(block, header, columns, strings=None):
+    first, rows = parse_block(block, strings)
+    return first, type_chunk(rows, header, columns)
+
+
+# --- Public loader ---
+def read_workbook_chunked(data, sheets=None, chunk_bytes=CHUNK_BYTES, workers=None):
+    """Parse sheets in row blocks on a process pool; same (frames, timings, skipped sheets) as read_workbook.
+
+    Only the columns the pipeline uses are kept, and CSD/CED, Contract Length
+    and Is_HH come back already derived. Blocks are parsed in-process with one
+    worker, or when this is already a pool worker (e.g. under app/batch.py,
+    which runs one tender per core).
+    """
+    frames, timings, skipped = {}, {}, {}
+    workers = workers or os.cpu_count() or 1
+    if multiprocessing.parent_process() is not None:
+        workers = 1
+    with zipfile.ZipFile(BytesIO(data)) as zf:
+        members = sheet_members(zf)
+        strings = shared_strings(zf)
+        names = list(members) if sheets is None else [s for s in sheets if s in members]
+        with ExitStack() as stack:
+            pool = None
+            if workers > 1:
+                # Spawned, not forked: uploads are parsed on a thread of a multi-threaded server
+                pool = stack.enter_context(ProcessPoolExecutor(
+                    max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker, initargs=(strings,)))
+            for name in names:
+                start = time.perf_counter()
+                try:
+                    frames[name] = _read_sheet(zf, name, members[name], strings, pool, workers, chunk_bytes)
+                except MissingColumnsError as e:
+                    skipped[name] = e
+                    continue
+                timings[name] = time.perf_counter() - start
+    return frames, timings, skipped
+
+
+def _read_sheet(zf, name, member, strings, pool, workers, chunk_bytes):
+    blocks = iter_row_blocks(zf, member, chunk_bytes)
+    first = next(blocks, None)
+    header_row, rows = parse_block(first, strings) if first is not None else (None, [])
+    if not rows:
+        validate_header([], name)
+
+    # The header comes from the first block; its remaining rows are typed here
+    header = [str(v) if v is not None else f"Unnamed: {i}" for i, v in enumerate(rows[0])]
+    columns = validate_header(header, name)
+    chunks = [type_chunk(rows[1:], header, columns)]
+    next_row = header_row + len(rows)
+
+    def add(result):
+        # Blank rows between blocks are padded too, so Sheet Row numbers stay right
+        nonlocal next_row
+        start, chunk = result
+        if start is None:
+            return
+        if start > next_row:
+            chunks.append(type_chunk([[]] * (start - next_row), header, columns))
+        chunks.append(chunk)
+        next_row = start + len(chunk)
+
+    # Keep at most two blocks per worker in flight so raw XML never piles up
+    pending = []
+    for block in blocks:
+        if pool is None:
+            add(_parse_and_type(block, header, columns, strings))
+            continue
+        pending.append(pool.submit(_parse_and_type, block, header, columns))
+        if len(pending) >= 2 * workers:
+            add(pending.pop(0).result())
+    for future in pending:
+        add(future.result())
+    frame = pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+    frame["MPXN"] = mpxn_values(frame["MPXN"])
+    return frame
@@ -0,0 +1,147 @@
+# instrumentation.py
+# Per-stage timing for the pricing pipeline: wall time, rows in/out and
+# memory per stage, collected per Streamlit rerun (one recorder per script
+# thread) and written to the "bespoke.stages" logger as JSON lines.
+
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+LOG_LEVEL = os.environ.get("BESPOKE_LOG_LEVEL", "INFO").upper()
+
+logger = logging.getLogger("bespoke.stages")
+if not logger.handlers:
+    # Own handler at INFO: the root logger defaults to WARNING and would drop every stage record
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(LOG_LEVEL)
+    logger.propagate = False
+
+# tracemalloc slows allocation-heavy stages noticeably, so it is opt-in
+TRACE_MEMORY = os.environ.get("BESPOKE_TRACE_MEMORY", "0") == "1"
+
+_local = threading.local()
+STARTUP = {}  # cold-start timings, filled once per server process by the entry point
+
+
+def rss_bytes():
+    """Return the current resident set size in bytes (0 where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+def process_uptime():
+    """Return seconds since this process started (None where /proc is unavailable)."""
+    try:
+        with open("/proc/self/stat") as fh:
+            # Fields after the parenthesised command name; starttime is field 22 overall
+            started = int(fh.read().rsplit(")", 1)[1].split()[19]) / os.sysconf("SC_CLK_TCK")
+        with open("/proc/uptime") as fh:
+            return float(fh.read().split()[0]) - started
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def row_count(value):
+    """Return len() for frames/arrays and the summed lengths of a tuple/dict of them, else None."""
+    if isinstance(value, dict):
+        value = tuple(value.values())
+    if isinstance(value, tuple):
+        counts = [row_count(v) for v in value]
+        return sum(c for c in counts if c is not None) if any(c is not None for c in counts) else None
+    if hasattr(value, "shape") and len(getattr(value, "shape", ())) >= 1:
+        return int(value.shape[0])
+    return None
+
+
+# --- Recorder ---
+class StageRecord(dict):
+    """One timed stage; set record["rows_out"] inside the block if it can't be inferred."""
+
+
+def start_run(trace_memory=None):
+    """Begin collecting stages for this rerun/thread and return the (empty) record list."""
+    _local.records = []
+    _local.depth = 0
+    _local.trace = TRACE_MEMORY if trace_memory is None else trace_memory
+    if _local.trace and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not _local.trace and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    return _local.records
+
+
+def current_run():
+    """Return the stages recorded so far in this rerun (empty outside start_run)."""
+    return getattr(_local, "records", [])
+
+
+@contextmanager
+def stage(name, rows_in=None):
+    """Time a block: wall time, RSS delta and (when tracing) the tracemalloc peak above the start."""
+    record = StageRecord(stage=name, rows_in=rows_in, rows_out=None, depth=getattr(_local, "depth", 0))
+    trace = getattr(_local, "trace", TRACE_MEMORY) and tracemalloc.is_tracing()
+    if trace:
+        base, _ = tracemalloc.get_traced_memory()
+        if record["depth"] == 0:
+            # Nested stages share the outer stage's peak window rather than resetting it
+            tracemalloc.reset_peak()
+    rss = rss_bytes()
+    _local.depth = record["depth"] + 1
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["seconds"] = round(time.perf_counter() - start, 4)
+        _local.depth = record["depth"]
+        record["rss_delta_mb"] = round((rss_bytes() - rss) / 2 ** 20, 1)
+        if trace:
+            _, peak = tracemalloc.get_traced_memory()
+            record["peak_mb"] = round((peak - base) / 2 ** 20, 1)
+        if hasattr(_local, "records"):
+            _local.records.append(record)
+        logger.info(json.dumps(dict(record)))
+
+
+def instrumented(name=None):
+    """Decorator form of stage(): rows_in from the first argument, rows_out from the result."""
+    def decorate(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(label, rows_in=row_count(args[0]) if args else None) as record:
+                result = fn(*args, **kwargs)
+                record["rows_out"] = row_count(result)
+            return result
+        return wrapper
+    return decorate
+
+
+# --- Streamlit panel ---
+def render_panel(records=None):
+    """Show this rerun's stages in the sidebar when the user opts in."""
+    import pandas as pd
+    import streamlit as st
+
+    records = current_run() if records is None else records
+    with st.sidebar:
+        if not st.toggle("⏱️ Stage timings", key="show_stage_timings"):
+            return
+        if not records:
+            st.caption("No stages recorded on this rerun.")
+            return
+        table = pd.DataFrame(records)
+        table["stage"] = ["  " * d + s for d, s in zip(table.pop("depth"), table["stage"])]
+        st.dataframe(table, hide_index=True, use_container_width=True)
+        st.caption(f"Total {sum(r['seconds'] for r in records if r['depth'] == 0):.2f}s"
+                   + ("" if "peak_mb" in table else " · set BESPOKE_TRACE_MEMORY=1 for peak memory"))
@@ -0,0 +1,127 @@
+# jobs.py
+# Background export jobs. Building and serialising large outputs runs on a
+# process-wide worker pool instead of the script thread, so reruns don't
+# cancel them; sessions keep job IDs in st.session_state and poll for the file.
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+JOB_WORKERS = int(os.environ.get("BESPOKE_JOB_WORKERS", "2"))
+JOB_TTL_SECONDS = 2 * 60 * 60  # finished files are kept this long for later download
+POLL_SECONDS = 1.0
+
+_pool = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="export")
+_jobs = {}
+_lock = threading.Lock()
+
+
+class Job:
+    """One background job; fields are written by the worker and read by any session rerun."""
+
+    def __init__(self, label, file_name=None, mime=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.label = label
+        self.file_name = file_name
+        self.mime = mime
+        self.status = "queued"  # queued -> running -> done | failed
+        self.progress = 0.0
+        self.message = "Queued"
+        self.result = None
+        self.preview = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+
+    def update(self, fraction, message=None):
+        """Progress callback handed to the job function (fraction 0-1)."""
+        self.progress = max(0.0, min(1.0, float(fraction)))
+        if message:
+            self.message = message
+
+    @property
+    def active(self):
+        return self.status in ("queued", "running")
+
+
+def _run(job, fn, args, kwargs):
+    job.status, job.message = "running", "Running"
+    try:
+        result = fn(*args, progress=job.update, **kwargs)
+        # Functions may return bytes, or (bytes, preview frame, file name, mime)
+        if isinstance(result, tuple):
+            job.result, job.preview = result[0], result[1]
+            if len(result) > 2:
+                job.file_name, job.mime = result[2], result[3]
+        else:
+            job.result = result
+        job.status, job.progress, job.message = "done", 1.0, "Ready"
+    except Exception as e:
+        job.status, job.error, job.message = "failed", f"{type(e).__name__}: {e}", "Failed"
+    finally:
+        job.finished = time.time()
+
+
+def submit(label, fn, *args, file_name=None, mime=None, **kwargs):
+    """Queue fn(*args, progress=callback, **kwargs) and return its job ID."""
+    prune()
+    job = Job(label, file_name, mime)
+    with _lock:
+        _jobs[job.id] = job
+    _pool.submit(_run, job, fn, args, kwargs)
+    return job.id
+
+
+def get(job_id):
+    with _lock:
+        return _jobs.get(job_id)
+
+
+def prune(ttl=JOB_TTL_SECONDS):
+    """Forget finished jobs older than ttl seconds (and their files)."""
+    cutoff = time.time() - ttl
+    with _lock:
+        for job_id in [j.id for j in _jobs.values() if j.finished and j.finished < cutoff]:
+            del _jobs[job_id]
+
+
+# --- Streamlit glue ---
+def session_jobs(state, key="export_jobs"):
+    """Return this session's job ID list, dropping IDs whose jobs have expired."""
+    ids = [job_id for job_id in state.get(key, []) if get(job_id) is not None]
+    state[key] = ids
+    return ids
+
+
+def render_jobs(job_ids, key="export_jobs"):
+    """Show progress and download buttons for job_ids, polling while any is still running."""
+    import streamlit as st
+
+    @st.fragment(run_every=POLL_SECONDS if any(get(j) and get(j).active for j in job_ids) else None)
+    def _panel():
+        jobs = [get(job_id) for job_id in job_ids]
+        for job in reversed([j for j in jobs if j is not None]):
+            with st.container(border=True):
+                st.markdown(f"**{job.label}** · {time.strftime('%H:%M:%S', time.localtime(job.created))}")
+                if job.active:
+                    st.progress(job.progress, text=job.message)
+                elif job.status == "failed":
+                    st.error(f"⚠️ {job.error}")
+                else:
+                    took = job.finished - job.created
+                    st.download_button(f"Download {job.file_name} ({took:.1f}s)", data=job.result,
+                                       file_name=job.file_name, mime=job.mime, key=f"{key}_{job.id}")
+                    if job.preview is not None:
+                        with st.expander("Preview"):
+                            st.dataframe(job.preview, use_container_width=True)
+        if jobs and not any(j.active for j in jobs if j is not None):
+            # Stop polling once everything has finished
+            if st.session_state.get(f"{key}_polling"):
+                st.session_state[f"{key}_polling"] = False
+                st.rerun()
+        else:
+            st.session_state[f"{key}_polling"] = True
+
+    _panel()
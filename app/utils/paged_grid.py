@@ -0,0 +1,85 @@
+# paged_grid.py
+# Server-side paged uplift grid for large portfolios. The full priced frame
+# stays in session state; only one page of filtered rows, and only the chosen
+# term's columns, is sent to the browser. Page edits are mapped back to frame
+# row positions and applied through the same incremental repricing.
+
+import math
+
+import numpy as np
+import streamlit as st
+
+from .incremental import apply_edits, session_frame, tac_dependencies
+
+PAGE_SIZES = (100, 250, 500, 1000)
+
+
+def term_columns(columns, schema, tac_label, term):
+    """Return the frame columns to show for one term: shared columns, then that term's rates/uplifts/TAC."""
+    deps, tac_cols = tac_dependencies(list(columns), schema, tac_label)
+    per_term = {col for col, t in deps.items() if t is not None} | set(tac_cols.values())
+    return [col for col in columns
+            if col not in per_term or deps.get(col) == term or col == tac_cols.get(term)]
+
+
+def filter_rows(frame, mpxn_query="", eac_min=None, eac_max=None):
+    """Return the row positions matching an MPXN substring and an EAC range."""
+    mask = np.ones(len(frame), dtype=bool)
+    if mpxn_query:
+        mask &= frame["MPXN"].astype(str).str.contains(mpxn_query.strip(), regex=False).to_numpy(dtype=bool)
+    if eac_min is not None or eac_max is not None:
+        eac = frame["EAC"].to_numpy(dtype=float)
+        if eac_min is not None:
+            mask &= eac >= eac_min
+        if eac_max is not None:
+            mask &= eac <= eac_max
+    return np.flatnonzero(mask)
+
+
+def page_delta(delta, positions):
+    """Translate a page-relative data_editor delta to full-frame row positions."""
+    return {"edited_rows": {int(positions[int(row)]): changes
+                            for row, changes in delta.get("edited_rows", {}).items()}}
+
+
+def paged_editor(key, fingerprint, build_frame, schema, tac_label, terms=None, rename=None,
+                 page_sizes=PAGE_SIZES, **editor_kwargs):
+    """Render one page of the session frame for a single term and return the full frame.
+
+    Rows cannot be added or deleted in paged mode; edits reprice only the touched MPXN/term.
+    """
+    frame_key, version_key = f"{key}_frame", f"{key}_version"
+    frame = session_frame(key, fingerprint, build_frame)
+    if terms is None:
+        terms = sorted(tac_dependencies(list(frame.columns), schema, tac_label)[1], key=int)
+
+    c1, c2, c3, c4 = st.columns([1, 2, 1, 1])
+    term = c1.selectbox("Term", [str(t) for t in terms], format_func=lambda t: f"{t}m", key=f"{key}_term")
+    query = c2.text_input("Filter MPXN", key=f"{key}_query")
+    eac_min = c3.number_input("Min EAC", min_value=0.0, value=None, key=f"{key}_eac_min")
+    page_size = c4.selectbox("Rows per page", page_sizes, key=f"{key}_page_size")
+
+    positions = filter_rows(frame, query, eac_min)
+    pages = max(1, math.ceil(len(positions) / page_size))
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, key=f"{key}_page")
+    visible = positions[(page - 1) * page_size:page * page_size]
+    st.caption(f"Showing {len(visible)} of {len(positions)} matching MPXNs ({len(frame)} total)")
+
+    columns = term_columns(frame.columns, schema, tac_label, term)
+    page_frame = frame.iloc[visible][columns].reset_index(drop=True)
+    shown = page_frame.rename(columns=rename) if rename else page_frame
+    columns_map = dict(zip(shown.columns, page_frame.columns))
+    # The page itself is part of the widget key so paging never replays an old delta
+    editor_key = f"{key}_page_editor_{st.session_state[version_key]}_{term}_{page}_{page_size}"
+
+    def _on_change():
+        delta = page_delta(st.session_state[editor_key], visible)
+        updated, _ = apply_edits(st.session_state[frame_key], delta, schema, tac_label, columns_map)
+        st.session_state[frame_key] = updated
+        st.session_state[version_key] += 1
+
+    tac_shown = [name for name, col in columns_map.items() if col.startswith("TAC")]
+    editor_kwargs.pop("num_rows", None)
+    st.data_editor(shown, key=editor_key, on_change=_on_change, disabled=tac_shown,
+                   num_rows="fixed", **editor_kwargs)
+    return st.session_state[frame_key]
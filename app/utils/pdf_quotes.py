@@ -0,0 +1,266 @@
+# pdf_quotes.py
+# Per-customer PDF quotes from the broker output frame: one quote per company
+# (or per MPXN when the output has no company column) with every term's rates
+# and annual cost. Quotes render in batches on a process pool; each worker
+# parses the Montserrat fonts once and reuses them for every document. fpdf is
+# only ever imported in the (spawned) workers, never in the Streamlit server.
+
+import atexit
+import datetime
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from .instrumentation import instrumented
+
+FONT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), ".streamlit")
+FONT_FAMILY = "Montserrat"
+FONT_STYLES = {"": "Regular", "B": "Bold", "I": "Italic"}
+QUOTE_WORKERS = int(os.environ.get("BESPOKE_PDF_WORKERS", "0")) or os.cpu_count() or 1  # across all exports
+SUBSET_CACHE = 256  # embedded font subsets kept per process
+QUOTE_BATCH = 50  # quotes per pool task, so row data is pickled in few large messages
+GROUP_COLUMNS = ("Company Name", "MPXN")
+TERM_COLUMN = re.compile(r"^(?P<name>.+) (?P<term>\d+)m \((?P<unit>[^)]+)\)$")
+NAVY, PINK = (15, 42, 82), (222, 0, 185)  # theme colours from .streamlit/config.toml
+
+
+# --- Frame layout ---
+def term_layout(columns):
+    """Return [(term, [(column, name, unit), ...])] for the per-term rate/cost columns, in column order."""
+    terms = {}
+    for col in columns:
+        match = TERM_COLUMN.match(str(col))
+        if match:
+            terms.setdefault(match["term"], []).append((col, match["name"], match["unit"]))
+    return list(terms.items())
+
+
+def quote_groups(frame, group_col=None):
+    """Return [(label, row positions)] with one group per company, else per MPXN, in first-seen order."""
+    group_col = group_col or next(col for col in GROUP_COLUMNS if col in frame.columns)
+    return [(label, rows) for label, rows in frame.groupby(group_col, sort=False, dropna=False).indices.items()]
+
+
+def safe_name(label):
+    """Return a file-system safe quote file name stem."""
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", str(label)).strip("_")[:80] or "quote"
+
+
+def _fmt(value, unit):
+    if value is None or value != value:
+        return "-"
+    if unit == "£":
+        return f"£{value:,.2f}"
+    return f"{value:,.3f}"
+
+
+# --- Rendering (runs in the worker processes) ---
+def _init_worker(cache_dir):
+    """Share font work across documents in this worker process.
+
+    fpdf's TTF metrics cache is pointed at cache_dir, so each font is parsed
+    once rather than per document. The embedded font subset is also memoised
+    per (font, character set): quotes use nearly the same characters, and
+    subsetting the TTF is most of a quote's render time. This patches fpdf
+    1.7's private TTFontFile (requirements.txt pins fpdf==1.7.2), so it only
+    runs in pool workers; other fpdf versions render without the memo.
+    """
+    import fpdf
+    from fpdf import fpdf as fpdf_module
+
+    if getattr(fpdf, "FPDF_VERSION", None) != "1.7.2":
+        return
+    fpdf.set_global("FPDF_CACHE_MODE", 2)
+    fpdf.set_global("FPDF_CACHE_DIR", cache_dir)
+
+    base = fpdf_module.TTFontFile
+    if getattr(base, "memoised", False):
+        return
+
+    class MemoisedTTFontFile(base):
+        memoised = True
+        subsets = {}
+
+        def makeSubset(self, file, subset):
+            # The subset's glyphs are sorted inside makeSubset, so character order doesn't matter
+            key = (file, frozenset(subset))
+            if key not in self.subsets:
+                if len(self.subsets) >= SUBSET_CACHE:
+                    self.subsets.clear()
+                stream = base.makeSubset(self, file, subset)
+                self.subsets[key] = (stream, self.codeToGlyph, self.maxUni)
+            # _putfonts reads codeToGlyph and maxUni off the instance after subsetting
+            stream, self.codeToGlyph, self.maxUni = self.subsets[key]
+            return stream
+
+    fpdf_module.TTFontFile = MemoisedTTFontFile
+
+
+def _quote_class():
+    from fpdf import FPDF
+
+    class QuotePDF(FPDF):
+        def header(self):
+            self.set_fill_color(*NAVY)
+            self.rect(0, 0, self.w, 22, "F")
+            self.set_text_color(255, 255, 255)
+            self.set_font(FONT_FAMILY, "B", 16)
+            self.set_xy(10, 7)
+            self.cell(0, 8, "Electricity Price Quote")
+            self.set_text_color(0, 0, 0)
+            self.set_y(28)
+
+        def footer(self):
+            self.set_y(-12)
+            self.set_font(FONT_FAMILY, "I", 7)
+            self.set_text_color(110, 110, 110)
+            self.cell(0, 5, f"Rates in p/day and p/kWh, costs in £ per year · page {self.page_no()}", align="C")
+
+    return QuotePDF
+
+
+_quote_pdf = None  # QuotePDF class, built once per process
+
+
+def render_quote(label, details, rows, layout, issued):
+    """Render one quote PDF and return its bytes.
+
+    details is [(caption, value)] for the header block; rows is [(MPXN, EAC,
+    {column: value})] and layout comes from term_layout().
+    """
+    global _quote_pdf
+    if _quote_pdf is None:
+        _quote_pdf = _quote_class()
+
+    pdf = _quote_pdf(format="A4")
+    for style, name in FONT_STYLES.items():
+        pdf.add_font(FONT_FAMILY, style, os.path.join(FONT_DIR, f"{FONT_FAMILY}-{name}.ttf"), uni=True)
+    pdf.set_auto_page_break(True, margin=16)
+    pdf.add_page()
+
+    pdf.set_font(FONT_FAMILY, "B", 12)
+    pdf.cell(0, 7, str(label), ln=1)
+    pdf.set_font(FONT_FAMILY, "", 9)
+    for caption, value in details + [("Issued", issued)]:
+        pdf.cell(0, 5, f"{caption}: {value}", ln=1)
+
+    for term, columns in layout:
+        pdf.ln(4)
+        pdf.set_font(FONT_FAMILY, "B", 10)
+        pdf.set_text_color(*PINK)
+        pdf.cell(0, 7, f"{term} month fixed", ln=1)
+        pdf.set_text_color(0, 0, 0)
+
+        headers = ["MPXN", "EAC (kWh)"] + [f"{name} ({unit})" for _, name, unit in columns]
+        width = (pdf.w - 20) / len(headers)
+        pdf.set_font(FONT_FAMILY, "B", 7)
+        pdf.set_fill_color(235, 238, 244)
+        for header in headers:
+            pdf.cell(width, 6, header, border=1, align="C", fill=True)
+        pdf.ln()
+
+        pdf.set_font(FONT_FAMILY, "", 7)
+        total = 0.0
+        for mpxn, eac, values in rows:
+            pdf.cell(width, 5, str(mpxn), border=1)
+            pdf.cell(width, 5, "-" if eac != eac else f"{eac:,.0f}", border=1, align="R")
+            for col, _, unit in columns:
+                pdf.cell(width, 5, _fmt(values[col], unit), border=1, align="R")
+                if unit == "£" and values[col] == values[col]:
+                    total += values[col]
+            pdf.ln()
+        if len(rows) > 1:
+            pdf.set_font(FONT_FAMILY, "B", 7)
+            pdf.cell(width * (len(headers) - 1), 5, "Total annual cost", border=1, align="R")
+            pdf.cell(width, 5, _fmt(total, "£"), border=1, align="R")
+            pdf.ln()
+
+    data = pdf.output(dest="S")
+    # fpdf 1.7 returns a latin-1 str, fpdf2 a bytearray
+    return data.encode("latin-1") if isinstance(data, str) else bytes(data)
+
+
+def _render_batch(batch, layout, issued):
+    return [(file_name, render_quote(label, details, rows, layout, issued))
+            for file_name, label, details, rows in batch]
+
+
+# --- Worker pool ---
+_pool_lock = threading.Lock()  # one quote pool at a time, so export jobs never exceed QUOTE_WORKERS
+_font_cache = None  # private font metrics cache directory, created once per server process
+
+
+def font_cache_dir():
+    """Return this process's private (0700) fpdf metrics cache directory, creating it on first use."""
+    global _font_cache
+    if _font_cache is None:
+        _font_cache = tempfile.mkdtemp(prefix="bespoke_fpdf_")
+        atexit.register(shutil.rmtree, _font_cache, ignore_errors=True)
+    return _font_cache
+
+
+# --- Public API ---
+def quote_jobs(frame, group_col=None):
+    """Return [(file name, label, details, rows)] ready for render_quote, one per quote."""
+    layout_columns = [col for _, columns in term_layout(frame.columns) for col, _, _ in columns]
+    detail_columns = [col for col in ("Company Reg", "Standard/Green") if col in frame.columns]
+    eac_col = next((col for col in ("EAC (kWh)", "EAC") if col in frame.columns), None)
+    values = frame[layout_columns].to_dict("records")
+    mpxns = frame["MPXN"].tolist()
+    eacs = frame[eac_col].tolist() if eac_col else [float("nan")] * len(frame)
+
+    jobs, seen = [], {}
+    for label, positions in quote_groups(frame, group_col):
+        first = positions[0]
+        details = [(col, frame[col].iat[first]) for col in detail_columns]
+        rows = [(mpxns[i], eacs[i], values[i]) for i in positions]
+        stem = safe_name(label)
+        seen[stem] = seen.get(stem, 0) + 1
+        file_name = f"{stem}.pdf" if seen[stem] == 1 else f"{stem}_{seen[stem]}.pdf"
+        jobs.append((file_name, label, details, rows))
+    return jobs
+
+
+@instrumented("pdf quotes")
+def build_quotes_zip(frame, group_col=None, workers=None, progress=None):
+    """Render one PDF quote per company (else per MPXN) and return them as zip bytes.
+
+    Quotes always render on a spawned process pool, even with one worker. Calls
+    from concurrent export jobs queue behind each other rather than each
+    starting a pool of their own.
+    """
+    layout = term_layout(frame.columns)
+    issued = datetime.date.today().strftime("%d %B %Y")
+    jobs = quote_jobs(frame, group_col)
+    batches = [jobs[i:i + QUOTE_BATCH] for i in range(0, len(jobs), QUOTE_BATCH)]
+    workers = max(min(workers or QUOTE_WORKERS, QUOTE_WORKERS, len(batches)), 1)
+
+    output = BytesIO()
+    # PDF page streams are already deflated, so the zip just stores them
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_STORED) as bundle:
+        def add(results, done):
+            for file_name, data in results:
+                bundle.writestr(file_name, data)
+            if progress is not None:
+                progress(done / max(len(jobs), 1))
+
+        done = 0
+        # Spawned, not forked: the export runs on a job thread of a multi-threaded server
+        context = multiprocessing.get_context("spawn")
+        with _pool_lock, ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                                             initargs=(font_cache_dir(),)) as pool:
+            if batches:
+                # One quote first writes the font metrics cache, so workers don't race to build it
+                pool.submit(_render_batch, batches[0][:1], layout, issued).result()
+            futures = [pool.submit(_render_batch, batch, layout, issued) for batch in batches]
+            # Collected in submission order so the zip lists quotes in frame order
+            for batch, future in zip(batches, futures):
+                done += len(batch)
+                add(future.result(), done)
+    return output.getvalue()
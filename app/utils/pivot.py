@@ -0,0 +1,100 @@
+# pivot.py
+# Wide per-MPXN uplift table built in one factorise/scatter pass, whatever
+# contract terms the tender actually contains.
+
+import numpy as np
+import pandas as pd
+
+from .cost_calc import as_float
+from .instrumentation import stage
+
+KEY = "MPXN"
+TERM_COL = "Contract Length"
+
+
+def term_codes(values):
+    """Return (codes, terms): an int code per row (-1 = no usable term) and the sorted term labels.
+
+    Only the distinct raw values are parsed, so 12, 12.0 and "12" all become "12" cheaply.
+    """
+    codes, uniques = pd.factorize(pd.Series(values))
+    numeric = pd.to_numeric(pd.Series(uniques, dtype=object), errors="coerce").round()
+    labels = [None if pd.isna(v) else str(int(v)) for v in numeric]
+
+    terms = sorted({label for label in labels if label is not None}, key=int)
+    position = {term: i for i, term in enumerate(terms)}
+    # The trailing -1 makes the factorize NA sentinel (-1) map to -1 as well
+    remap = np.array([position.get(label, -1) for label in labels] + [-1], dtype=np.int64)
+    return remap[codes], terms
+
+
+def build_term_pivot(df, value_cols, key=KEY, term_col=TERM_COL):
+    """Return (base, pivoted): an MPXN/EAC frame and {(col, term): array} aligned to it.
+
+    MPXN and term are factorised once into integer codes; each column is then
+    scattered straight into an MPXN x term array, with no per-term filtering.
+    Rows keep first-appearance order and EAC is the first non-blank value per
+    MPXN (like groupby.first), NaN when none of its rows has one.
+    """
+    key_codes, key_values = pd.factorize(df[key])
+    eac = as_float(df["EAC"])
+    has_eac = (key_codes >= 0) & ~np.isnan(eac)
+    first_eac = np.full(len(key_values), np.nan)
+    # Reversed so the first non-blank EAC per MPXN is the last write
+    first_eac[key_codes[has_eac][::-1]] = eac[has_eac][::-1]
+    base = pd.DataFrame({key: key_values, "EAC": first_eac})
+
+    present = [col for col in value_cols if col in df.columns]
+    if not present or base.empty:
+        return base, {}
+
+    t_codes, terms = term_codes(df[term_col])
+    valid = (key_codes >= 0) & (t_codes >= 0)
+    # Reversed so that, with NumPy's last-write-wins fancy assignment, the first
+    # non-null value per (MPXN, term) is the one that lands (same as groupby.first)
+    cells = (key_codes[valid] * len(terms) + t_codes[valid])[::-1]
+
+    pivoted = {}
+    for col in present:
+        values = as_float(df[col])[valid][::-1]
+        keep = ~np.isnan(values)
+        wide = np.full(len(base) * len(terms), np.nan)
+        wide[cells[keep]] = values[keep]
+        wide = wide.reshape(len(base), len(terms))
+        for i, term in enumerate(terms):
+            pivoted[(col, term)] = wide[:, i]
+    return base, pivoted
+
+
+def build_uplift_table(df, schema, terms=None, tac_label="TAC {term}m (£)", fill=None):
+    """Build the uplift editor table: MPXN, EAC, then per term rates, zeroed uplifts and TAC.
+
+    Components whose source column is absent from the tender are left out. Terms
+    default to whatever the data contains; requested terms missing from the data
+    still get their columns (rates NaN) so the layout stays stable. With fill,
+    blank rates are replaced before TAC is computed, so the initial TAC matches
+    what an incremental reprice of the filled table gives.
+    """
+    schema = schema.restrict_to(df.columns)
+    base, pivoted = build_term_pivot(df, schema.rate_columns)
+    if terms is None:
+        terms = sorted({term for _, term in pivoted}, key=int)
+    terms = [str(term) for term in terms]
+    missing = np.full(len(base), np.nan)
+
+    columns = {KEY: base[KEY].to_numpy(), "EAC": base["EAC"].to_numpy()}
+    for term in terms:
+        for c in schema.components:
+            rates = pivoted.get((c.column, term), missing)
+            columns[schema.rate_column(c, term)] = rates if fill is None else np.where(np.isnan(rates), fill, rates)
+        for c in schema.components:
+            columns[schema.uplift_column(c, term)] = np.zeros(len(base))
+
+    table = pd.DataFrame(columns)
+    with stage("tac", rows_in=len(table)) as record:
+        for term in terms:
+            # Insert each TAC straight after that term's uplift columns
+            last = table.columns.get_loc(schema.uplift_columns(term)[-1]) if schema.components else len(table.columns) - 1
+            table.insert(last + 1, tac_label.format(term=term), schema.tac(table, term))
+        record["rows_out"] = len(table)
+    return table
@@ -0,0 +1,71 @@
+# quality.py
+# Duplicate and conflicting quote rows. The pivot keeps the first non-blank
+# rate per MPXN and term, so repeated rows are otherwise dropped silently.
+# Repeated MPXN/term pairs are found with one hashed duplicated() pass; only
+# those rows then have their rates hashed, so a clean tender costs one pass.
+
+import numpy as np
+import pandas as pd
+
+from .formatter import CSV_MIME, to_csv_bytes
+from .instrumentation import instrumented
+from .pivot import KEY, TERM_COL
+from .tender_columns import rate_columns
+
+ISSUES = ("Conflict", "Duplicate")
+
+
+@instrumented("quality")
+def quote_issues(df, key=KEY, term_col=TERM_COL):
+    """Return one report row per tender row whose MPXN/term appears more than once.
+
+    Issue is "Duplicate" when every row of the pair carries the same rates and
+    "Conflict" when they differ. Kept marks each pair's first row, whose rates
+    the pivot uses (a blank rate there is taken from the next row that has
+    one). Sheet Row is the Excel row (header on row 1), so pass the sheet as
+    loaded, before any row filtering.
+    """
+    rates = [col for col in rate_columns() if col in df.columns]
+    columns = [key, term_col] + (["EAC"] if "EAC" in df.columns else []) + rates
+    quoted = df[term_col].notna().to_numpy()
+    repeated = quoted & df.duplicated([key, term_col], keep=False).to_numpy()
+    if not repeated.any():
+        return pd.DataFrame(columns=["Sheet Row", "Issue", "Kept"] + columns)
+
+    rows = df.loc[repeated, columns]
+    rate_hash = pd.Series(pd.util.hash_pandas_object(rows[rates], index=False).to_numpy(), index=rows.index)
+    variants = rate_hash.groupby([rows[key], rows[term_col]], sort=False).transform("nunique").to_numpy()
+
+    report = rows.copy()
+    report.insert(0, "Sheet Row", report.index.to_numpy() + 2)
+    report.insert(1, "Issue", np.where(variants > 1, ISSUES[0], ISSUES[1]))
+    report.insert(2, "Kept", ~rows.duplicated([key, term_col]).to_numpy())
+    # Conflicts first, each pair's rows together in sheet order
+    order = report.assign(_rank=report["Issue"] != ISSUES[0]).sort_values(
+        ["_rank", key, term_col, "Sheet Row"], kind="stable").index
+    return report.loc[order].reset_index(drop=True)
+
+
+def issue_summary(report, key=KEY, term_col=TERM_COL):
+    """Return {issue: number of affected MPXN/term pairs} for a quote_issues() report."""
+    pairs = report.drop_duplicates([key, term_col])
+    return {issue: int((pairs["Issue"] == issue).sum()) for issue in ISSUES}
+
+
+def format_summary(summary):
+    return " · ".join(f"{count:,} {issue.lower()} MPXN/term pair{'s' if count != 1 else ''}"
+                      for issue, count in summary.items() if count)
+
+
+# --- Streamlit panel ---
+def render_issues(report, file_stem="quote_issues"):
+    """Warn about duplicate/conflicting rows and offer the full report as a CSV download."""
+    import streamlit as st
+
+    if report.empty:
+        return
+    st.warning(f"⚠️ Repeated quote rows: {format_summary(issue_summary(report))}. The first row of each is priced.")
+    with st.expander("Duplicate & conflict report"):
+        st.dataframe(report.head(1_000), hide_index=True, use_container_width=True)
+        st.download_button("Download report (CSV)", data=to_csv_bytes(report), file_name=f"{file_stem}.csv",
+                           mime=CSV_MIME, key=f"{file_stem}_download")
@@ -0,0 +1,132 @@
+# shared_cache.py
+# Process-wide LRU of parsed and pivoted tender frames, shared by every
+# Streamlit session in the worker. Callers get shallow views: with pandas
+# copy-on-write a session's edits copy only the columns it touches, so N
+# brokers on one tender cost roughly one copy of its memory. Copy-on-write is
+# always on from pandas 3.0, hence the pin in requirements.txt; on older pandas
+# an in-place edit through a view would write into every session's frame.
+
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .dtypes import format_bytes, frame_memory
+
+SHARED_MAX_BYTES = int(os.environ.get("BESPOKE_SHARED_MB", "256")) * 1024 * 1024
+
+
+def value_size(value):
+    """Return the memory held by a cached value (a frame, array or dict/tuple of them)."""
+    if isinstance(value, pd.DataFrame):
+        return frame_memory(value)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(value_size(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(value_size(v) for v in value)
+    return 0
+
+
+def view(value):
+    """Return a zero-copy view of a cached value that is safe to hand to one session."""
+    if isinstance(value, pd.DataFrame):
+        return value.copy(deep=False)
+    if isinstance(value, np.ndarray):
+        out = value.view()
+        out.flags.writeable = False
+        return out
+    if isinstance(value, dict):
+        return {k: view(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return tuple(view(v) for v in value)
+    return value
+
+
+class SharedCache:
+    """Thread-safe LRU with a byte ceiling and hit/miss/eviction counters."""
+
+    def __init__(self, max_bytes=SHARED_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._lock = threading.Lock()
+        self._building = {}  # key -> Lock, so concurrent sessions build a tender only once
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        """Return a view of the cached value, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return view(entry[0])
+
+    def put(self, key, value):
+        """Store value (callers must not mutate it afterwards) and evict down to the ceiling."""
+        size = value_size(value)
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return  # Larger than the whole budget: don't flush everything else for it
+            self._entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def get_or_build(self, key, build):
+        """Return a view of the cached value, calling build() once on a miss."""
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            key_lock = self._building.setdefault(key, threading.Lock())
+        with key_lock:
+            # Another session may have built it while we waited
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is not None:
+                return view(entry[0])
+            value = build()
+            self.put(key, value)
+        with self._lock:
+            self._building.pop(key, None)
+        return view(value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        """Return counters for display, e.g. in the sidebar."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# One cache per Python process, i.e. shared by every session of the Streamlit server
+SHARED = SharedCache()
+
+
+def format_stats(stats):
+    """Return a one-line summary such as "4 cached · 41.2 MB / 256.0 MB · 6 hits / 2 misses (75%)"."""
+    return (f"{stats['entries']} cached · {format_bytes(stats['bytes'])} / {format_bytes(stats['max_bytes'])}"
+            f" · {stats['hits']} hits / {stats['misses']} misses ({stats['hit_rate']:.0%})")
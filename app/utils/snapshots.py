@@ -0,0 +1,148 @@
+# snapshots.py
+# Pricing session snapshots. After every edit the session's uplift tables are
+# written to .sessions/ as uncompressed Arrow IPC files, so a reloaded tab or a
+# restarted dyno can memory-map them back instead of re-keying the uplifts.
+
+import json
+import os
+import shutil
+import time
+import uuid
+
+import streamlit as st
+
+from .incremental import replace_frame
+from .versioning import APP_VERSION
+
+SNAPSHOT_DIR = os.environ.get("BESPOKE_SNAPSHOT_DIR", ".sessions")
+SNAPSHOT_MAX = int(os.environ.get("BESPOKE_SNAPSHOTS", "20"))  # most recent snapshots kept on disk
+META_FILE = "meta.json"
+
+
+# --- Arrow files ---
+def write_frame(path, frame):
+    """Write a frame as an uncompressed Arrow IPC file, atomically (readers never see half a file)."""
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp, path)
+
+
+def read_frame(path):
+    """Memory-map an Arrow IPC file back into a DataFrame (no parse step, pages load on demand)."""
+    import pyarrow as pa
+
+    with pa.memory_map(path, "r") as source:
+        return pa.ipc.open_file(source).read_all().to_pandas()
+
+
+def _write_meta(folder, meta):
+    tmp = os.path.join(folder, f"{META_FILE}.tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(meta, fh)
+    os.replace(tmp, os.path.join(folder, META_FILE))
+
+
+def _read_meta(folder):
+    try:
+        with open(os.path.join(folder, META_FILE), encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return None
+
+
+# --- Snapshots ---
+def snapshot_id(digest):
+    """Return this browser session's snapshot ID for a tender (one per session and tender)."""
+    ids = st.session_state.setdefault("snapshot_ids", {})
+    if digest not in ids:
+        ids[digest] = f"{digest[:16]}_{uuid.uuid4().hex[:8]}"
+    return ids[digest]
+
+
+def save_session(digest, keys, file_name=None):
+    """Write every edited session table among keys to this session's snapshot; returns the keys written.
+
+    A table is written only when its edit version moved since the last save, so
+    reruns without edits cost one dict lookup per key.
+    """
+    state = st.session_state
+    changed = [key for key in keys
+               if state.get(f"{key}_frame") is not None
+               and state.get(f"{key}_version", 0) > state.get(f"{key}_snapshot_version", 0)
+               and tuple(state.get(f"{key}_fingerprint", ()))[:1] == (digest,)]
+    if not changed:
+        return []
+
+    folder = os.path.join(SNAPSHOT_DIR, snapshot_id(digest))
+    os.makedirs(folder, exist_ok=True)
+    meta = _read_meta(folder) or {"digest": digest, "frames": {}}
+    for key in changed:
+        write_frame(os.path.join(folder, f"{key}.arrow"), state[f"{key}_frame"])
+        meta["frames"][key] = {
+            "fingerprint": list(state[f"{key}_fingerprint"]),
+            "rows": len(state[f"{key}_frame"]),
+        }
+        state[f"{key}_snapshot_version"] = state[f"{key}_version"]
+    meta.update(file_name=file_name or meta.get("file_name"), saved=time.time(), version=APP_VERSION)
+    _write_meta(folder, meta)
+    prune()
+    return changed
+
+
+def list_snapshots(digest=None):
+    """Return snapshot metadata (newest first), optionally only those for one tender."""
+    if not os.path.isdir(SNAPSHOT_DIR):
+        return []
+    snapshots = []
+    for name in os.listdir(SNAPSHOT_DIR):
+        meta = _read_meta(os.path.join(SNAPSHOT_DIR, name))
+        if meta is None or (digest is not None and meta.get("digest") != digest):
+            continue
+        meta["id"] = name
+        snapshots.append(meta)
+    return sorted(snapshots, key=lambda meta: meta["saved"], reverse=True)
+
+
+def snapshot_label(meta):
+    """One-line description of a snapshot for the restore picker."""
+    saved = time.strftime("%d %b %H:%M", time.localtime(meta["saved"]))
+    tables = ", ".join(sorted(meta["frames"]))
+    return f"{saved} · {meta.get('file_name') or meta['digest'][:8]} · {tables}"
+
+
+def restore_session(snapshot):
+    """Load a snapshot's tables into session state; returns (tables restored, seconds)."""
+    start = time.perf_counter()
+    folder = os.path.join(SNAPSHOT_DIR, snapshot["id"])
+    for key, info in snapshot["frames"].items():
+        replace_frame(key, tuple(info["fingerprint"]), read_frame(os.path.join(folder, f"{key}.arrow")))
+        # Already on disk, so the next save_session skips it until it is edited again
+        st.session_state[f"{key}_snapshot_version"] = st.session_state[f"{key}_version"]
+    # Further edits keep saving into the restored snapshot
+    st.session_state.setdefault("snapshot_ids", {})[snapshot["digest"]] = snapshot["id"]
+    return len(snapshot["frames"]), time.perf_counter() - start
+
+
+def prune(keep=SNAPSHOT_MAX):
+    """Delete all but the keep most recently saved snapshots."""
+    for meta in list_snapshots()[keep:]:
+        shutil.rmtree(os.path.join(SNAPSHOT_DIR, meta["id"]), ignore_errors=True)
+
+
+# --- Streamlit glue ---
+def render_restore(digest):
+    """Sidebar picker that restores a saved snapshot of this tender's uplift tables."""
+    snapshots = list_snapshots(digest)
+    if not snapshots:
+        return
+    with st.sidebar:
+        st.markdown("**🕘 Saved sessions**")
+        choice = st.selectbox("Snapshot", range(len(snapshots)), format_func=lambda i: snapshot_label(snapshots[i]),
+                              key=f"snapshot_choice_{digest[:16]}", label_visibility="collapsed")
+        if st.button("Restore snapshot", key=f"snapshot_restore_{digest[:16]}"):
+            count, seconds = restore_session(snapshots[choice])
+            st.success(f"Restored {count} table(s) in {seconds:.2f}s")
@@ -0,0 +1,82 @@
+# tariff_schema.py
+# Declarative tariff definitions. Each tariff lists its cost components once;
+# pivot columns, uplift columns and the TAC expression are all derived from it.
+
+from collections import namedtuple
+from functools import lru_cache
+
+from .cost_calc import weighted_tac
+
+# basis "day": charged every day of the year (p/day, p/kVA/day)
+# basis "kWh": charged on weight x EAC (p/kWh)
+Component = namedtuple("Component", ["name", "column", "unit", "basis", "weight", "uplift"])
+
+TARIFFS = {
+    # Single-rate broker output (main1 / broker_output)
+    "STANDARD": [
+        Component("Standing Charge", "Standing Charge (p/day)", "p/day", "day", 1.0, "S/C"),
+        Component("Unit Rate", "Standard Rate (p/kWh)", "p/kWh", "kWh", 1.0, "Unit Rate"),
+    ],
+    "NHH": [
+        Component("Standing Charge", "Standing Charge (p/day)", "p/day", "day", 1.0, "SC"),
+        Component("Day Rate", "Day Rate (p/kWh)", "p/kWh", "kWh", 0.50, "Day"),
+        Component("Night Rate", "Night Rate (p/kWh)", "p/kWh", "kWh", 0.30, "Night"),
+        Component("E/W Rate", "E/W Rate (p/kWh)", "p/kWh", "kWh", 0.20, "E/W"),
+    ],
+    "HH": [
+        Component("Standing Charge", "Standing Charge (p/day)", "p/day", "day", 1.0, "SC"),
+        Component("Day Rate", "All Year - Day Rate (p/kWh)", "p/kWh", "kWh", 0.70, "Day"),
+        Component("Night Rate", "All Year - Night Rate (p/kWh)", "p/kWh", "kWh", 0.30, "Night"),
+        Component("DUoS", "DUoS (p/KVA/Day)", "p/kVA/day", "day", 1.0, "DUoS"),
+        Component("Metering", "Metering Charge (p/day)", "p/day", "day", 1.0, "Metering"),
+    ],
+}
+# main11 (and the pipeline built from it) has always priced HH without the metering charge
+TARIFFS["HH_EXCL_METERING"] = [c for c in TARIFFS["HH"] if c.name != "Metering"]
+
+
+class TariffSchema:
+    """A tariff compiled into the column lists and TAC inputs used by the pipeline."""
+
+    def __init__(self, name, components):
+        for c in components:
+            if c.basis not in ("day", "kWh"):
+                raise ValueError(f"{name}: unknown basis {c.basis!r} for {c.name}")
+        self.name = name
+        self.components = tuple(components)
+        self.rate_columns = [c.column for c in self.components]
+        self.uplift_names = [c.uplift for c in self.components]
+        self.per_day = [(c.column, c.uplift) for c in self.components if c.basis == "day"]
+        self.per_kwh = [(c.column, c.uplift, c.weight) for c in self.components if c.basis == "kWh"]
+
+    def __repr__(self):
+        return f"TariffSchema({self.name!r}, {len(self.components)} components)"
+
+    def rate_column(self, component, term):
+        return f"{component.column} {term}m"
+
+    def uplift_column(self, component, term):
+        return f"{component.uplift} Uplift {term}m"
+
+    def pivot_columns(self, term):
+        return [self.rate_column(c, term) for c in self.components]
+
+    def uplift_columns(self, term):
+        return [self.uplift_column(c, term) for c in self.components]
+
+    def restrict_to(self, columns):
+        """Return the schema without components whose source column is absent."""
+        present = [c for c in self.components if c.column in set(columns)]
+        if len(present) == len(self.components):
+            return self
+        return TariffSchema(self.name, present)
+
+    def tac(self, frame, term, eac_col="EAC"):
+        """Vectorised TAC (£) for one term of a wide per-MPXN frame."""
+        return weighted_tac(frame, term, self.per_day, self.per_kwh, eac_col=eac_col)
+
+
+@lru_cache(maxsize=None)
+def get_schema(name):
+    """Return the compiled schema for a tariff (compiled once per process)."""
+    return TariffSchema(name, TARIFFS[name])
@@ -0,0 +1,71 @@
+# tender_columns.py
+# The supplier tender columns the pipeline actually reads: keys and dates,
+# every tariff component's rate column and the meter classification inputs.
+
+import pandas as pd
+
+from .classify import METER_CLASS_RULES
+from .tariff_schema import TARIFFS
+
+KEY_COLUMNS = ["MPXN", "EAC", "CSD", "CED"]
+REQUIRED_COLUMNS = KEY_COLUMNS
+DATE_COLUMNS = ["CSD", "CED"]
+# Optional columns kept when a sheet has them (older pages read the supplier's own term)
+PASSTHROUGH_COLUMNS = ["Contract Length"]
+
+
+class MissingColumnsError(ValueError):
+    """A tender sheet lacks columns the pipeline cannot work without."""
+
+    def __init__(self, sheet, missing):
+        self.sheet = sheet
+        self.missing = list(missing)
+        super().__init__(f"Sheet '{sheet}' is missing required column(s): {', '.join(self.missing)}")
+
+
+def rate_columns():
+    """Return every rate column any tariff or meter class rule reads, in first-seen order."""
+    columns = [c.column for components in TARIFFS.values() for c in components]
+    columns += [col for _, rule_columns in METER_CLASS_RULES for col in rule_columns]
+    return list(dict.fromkeys(columns))
+
+
+def used_columns(header):
+    """Return the header columns the pipeline uses, in sheet order."""
+    wanted = set(KEY_COLUMNS) | set(PASSTHROUGH_COLUMNS) | set(rate_columns())
+    return [col for col in header if col in wanted]
+
+
+def column_dtypes(columns):
+    """Return explicit read dtypes: float64 for the numeric columns, object for MPXN (dates are left to the parser).
+
+    MPXN cells keep their own types, so a text MPXN such as "0123" stays text.
+    """
+    numeric = {"EAC"} | set(rate_columns())
+    dtypes = {col: "float64" for col in columns if col in numeric}
+    if "MPXN" in columns:
+        dtypes["MPXN"] = object
+    return dtypes
+
+
+def mpxn_values(values):
+    """Return a sheet's MPXN cells as numbers when none is text, else all as text.
+
+    A text MPXN such as "0123" keeps its leading zero; in a mixed column the
+    numeric cells are written as whole numbers ("1000", not "1000.0").
+    """
+    values = pd.Series(values).infer_objects()
+    if values.dtype != object:
+        return values
+    return values.map(lambda v: v if isinstance(v, str) or pd.isna(v) else str(v)).astype("str")
+
+
+def validate_header(header, sheet):
+    """Return the used columns of a sheet header, raising MissingColumnsError before any rows are parsed."""
+    header = [str(col) for col in header]
+    missing = [col for col in REQUIRED_COLUMNS if col not in header]
+    if missing:
+        raise MissingColumnsError(sheet, missing)
+    if not set(header) & set(rate_columns()):
+        raise MissingColumnsError(sheet, ["any rate column (e.g. Standing Charge (p/day))"])
+    return used_columns(header)
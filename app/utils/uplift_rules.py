@@ -0,0 +1,169 @@
+# uplift_rules.py
+# Bulk uplift rules such as "NHH, EAC < 50,000, 36m -> +1.2p Day", applied to
+# a whole priced table in one vectorised pass. EACs are bucketed once against
+# every band edge the rules mention, so each rule is a lookup on band codes.
+
+import json
+import os
+from collections import namedtuple
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+from .tariff_schema import TARIFFS, get_schema
+
+RULE_FIELDS = ["meter_type", "term", "component", "uplift", "eac_min", "eac_max", "mpxn_prefix"]
+
+# Blank / None fields match anything; EAC bands are [eac_min, eac_max)
+UpliftRule = namedtuple("UpliftRule", RULE_FIELDS)
+
+
+def component_names(meter_type=None):
+    """Return the names a rule may use for a component (name or uplift label) of one tariff, or of any."""
+    tariffs = [TARIFFS[meter_type]] if meter_type in TARIFFS else TARIFFS.values()
+    return {name for components in tariffs for c in components for name in (c.name, c.uplift)}
+
+
+def _check_component(component, meter_type=None):
+    known = component_names(meter_type)
+    if component not in known:
+        raise ValueError(f"Unknown uplift rule component {component!r}"
+                         f"{f' for {meter_type}' if meter_type else ''}; use one of: {', '.join(sorted(known))}")
+
+
+def _blank(value):
+    return value is None or (isinstance(value, float) and np.isnan(value)) or str(value).strip() == ""
+
+
+def _number(value, default):
+    return default if _blank(value) else float(str(value).replace(",", ""))
+
+
+def parse_rule(record):
+    """Return an UpliftRule from a dict (CSV row, JSON object or editor row).
+
+    Raises ValueError for a missing field or a component no tariff has (names are case-sensitive).
+    """
+    if _blank(record.get("component")) or _blank(record.get("uplift")):
+        raise ValueError(f"Uplift rule needs 'component' and 'uplift': {record}")
+    term = record.get("term")
+    meter_type = None if _blank(record.get("meter_type")) else str(record["meter_type"]).strip().upper()
+    component = str(record["component"]).strip()
+    _check_component(component, meter_type)
+    return UpliftRule(
+        meter_type=meter_type,
+        term=None if _blank(term) else str(int(float(str(term).strip().rstrip("mM")))),
+        component=component,
+        uplift=_number(record["uplift"], 0.0),
+        eac_min=_number(record.get("eac_min"), -np.inf),
+        eac_max=_number(record.get("eac_max"), np.inf),
+        mpxn_prefix=None if _blank(record.get("mpxn_prefix")) else str(record["mpxn_prefix"]).strip(),
+    )
+
+
+def load_rules(source, name=None):
+    """Read uplift rules from a .csv/.json path or upload; later rules win where they overlap."""
+    name = str(name or getattr(source, "name", source))
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as fh:
+            data = fh.read()
+    else:
+        data = source.getvalue() if hasattr(source, "getvalue") else source.read()
+
+    if name.lower().endswith(".json"):
+        records = json.loads(data.decode("utf-8"))
+    else:
+        records = pd.read_csv(BytesIO(data), dtype=str, keep_default_na=False).to_dict("records")
+    return [parse_rule(record) for record in records]
+
+
+def rules_frame(rules=()):
+    """Return rules as an editable DataFrame (blank = any), e.g. for st.data_editor."""
+    rows = [{
+        **rule._asdict(),
+        "eac_min": None if np.isinf(rule.eac_min) else rule.eac_min,
+        "eac_max": None if np.isinf(rule.eac_max) else rule.eac_max,
+    } for rule in rules]
+    return pd.DataFrame(rows, columns=RULE_FIELDS)
+
+
+def rules_from_frame(frame):
+    """Return UpliftRules from an edited rules frame, skipping empty rows."""
+    records = frame.to_dict("records")
+    return [parse_rule(r) for r in records if not (_blank(r.get("component")) and _blank(r.get("uplift")))]
+
+
+# --- Matching ---
+class RuleMatcher:
+    """Row masks for a priced table, with EAC band codes and prefix masks computed once."""
+
+    def __init__(self, table, rules):
+        edges = sorted({e for r in rules for e in (r.eac_min, r.eac_max) if np.isfinite(e)})
+        self.edges = np.asarray(edges, dtype=float)
+        eac = np.nan_to_num(pd.to_numeric(table["EAC"], errors="coerce").to_numpy(dtype=float), nan=0.0)
+        # band k holds EACs in [edges[k-1], edges[k])
+        self.bands = np.searchsorted(self.edges, eac, side="right")
+        self.n = len(table)
+        self._mpxn = table["MPXN"].astype(str) if any(r.mpxn_prefix for r in rules) else None
+        self._prefix_masks = {}
+
+    def _band(self, value):
+        if np.isinf(value):
+            return 0 if value < 0 else len(self.edges) + 1
+        return int(np.searchsorted(self.edges, value, side="right"))
+
+    def mask(self, rule):
+        """Boolean row mask for one rule's EAC band and MPXN prefix."""
+        mask = np.ones(self.n, dtype=bool)
+        if np.isfinite(rule.eac_min) or np.isfinite(rule.eac_max):
+            lo, hi = self._band(rule.eac_min), self._band(rule.eac_max)
+            mask &= (self.bands >= lo) & (self.bands < hi)
+        if rule.mpxn_prefix:
+            if rule.mpxn_prefix not in self._prefix_masks:
+                self._prefix_masks[rule.mpxn_prefix] = self._mpxn.str.startswith(rule.mpxn_prefix).to_numpy(dtype=bool)
+            mask &= self._prefix_masks[rule.mpxn_prefix]
+        return mask
+
+
+def apply_rules(table, meter_type, rules, terms, tac_label=None):
+    """Write matching rule uplifts into table in place and reprice affected terms.
+
+    Returns the set of terms whose uplifts changed; TACs are only recomputed when tac_label is given.
+    Raises ValueError for a rule made for this meter type whose component its tariff does not have.
+    """
+    full = get_schema(meter_type)
+    # Only components the tender actually quoted have uplift columns
+    schema = full.restrict_to([c.column for c in full.components
+                               if any(full.uplift_column(c, t) in table.columns for t in terms)])
+    rules = [r for r in rules if r.meter_type in (None, meter_type)]
+    for rule in rules:
+        if rule.meter_type is not None:
+            _check_component(rule.component, meter_type)
+    if not rules or table.empty:
+        return set()
+
+    matcher = RuleMatcher(table, rules)
+    updates = {}
+    for rule in rules:
+        components = [c for c in schema.components if rule.component in (c.uplift, c.name)]
+        if not components:
+            continue
+        mask = matcher.mask(rule)
+        if not mask.any():
+            continue
+        for term in (terms if rule.term is None else [rule.term]):
+            for c in components:
+                col = schema.uplift_column(c, term)
+                if col not in table.columns:
+                    continue
+                if col not in updates:
+                    updates[col] = (term, pd.to_numeric(table[col], errors="coerce").to_numpy(dtype=float, copy=True))
+                updates[col][1][mask] = rule.uplift
+
+    for col, (_, values) in updates.items():
+        table[col] = values
+    repriced = {term for term, _ in updates.values()}
+    for term in (repriced if tac_label else ()):
+        table[tac_label.format(term=term)] = schema.tac(table, term)
+    return repriced
@@ -0,0 +1,90 @@
+# bench_pivot.py
+# Compares the shared single-groupby pivot builder with the per-term loop
+# that main9-main11 used. Run from the repo root:
+#     python -m benchmarks.bench_pivot --mpxns 50000 --terms 12 24 36
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.utils.pivot import build_uplift_table
+from app.utils.tariff_schema import get_schema
+
+NHH_RATES = ["Standing Charge (p/day)", "Day Rate (p/kWh)", "Night Rate (p/kWh)", "E/W Rate (p/kWh)"]
+NHH_UPLIFTS = ["SC", "Day", "Night", "E/W"]
+
+
+def synthetic_long_frame(mpxns, terms, seed=0):
+    """Return one row per MPXN x term, shaped like a parsed NHH tender sheet."""
+    rng = np.random.default_rng(seed)
+    mpxn = np.repeat(np.arange(1_000_000_000_000, 1_000_000_000_000 + mpxns), len(terms))
+    df = pd.DataFrame({
+        "MPXN": mpxn,
+        "EAC": np.repeat(rng.integers(1_000, 500_000, mpxns), len(terms)).astype(float),
+        "Contract Length": np.tile([str(t) for t in terms], mpxns),
+    })
+    for col in NHH_RATES:
+        df[col] = rng.uniform(5, 60, len(df)).round(3)
+    return df
+
+
+def legacy_build_uplift_editor(df, terms):
+    """The main11 per-term loop, kept here as the benchmark baseline."""
+    df = df.copy()
+    df["EAC"] = df["EAC"].fillna(0)
+    df["Contract Length"] = df["Contract Length"].astype(str)
+    base_df = df.drop_duplicates(subset=["MPXN"])[["MPXN", "EAC"]].copy()
+
+    for term in terms:
+        sub_df = df[df["Contract Length"] == str(term)].drop_duplicates(subset=["MPXN"])
+        for col in NHH_RATES:
+            mapping = sub_df.set_index("MPXN")[col]
+            base_df[f"{col} {term}m"] = base_df["MPXN"].map(mapping)
+        for col in NHH_UPLIFTS:
+            base_df[f"{col} Uplift {term}m"] = 0.000
+
+        tac = (
+            base_df[f"Standing Charge (p/day) {term}m"] * 365 +
+            base_df["EAC"] * (base_df[f"Day Rate (p/kWh) {term}m"] + base_df[f"Day Uplift {term}m"]) * 0.50 +
+            base_df["EAC"] * (base_df[f"Night Rate (p/kWh) {term}m"] + base_df[f"Night Uplift {term}m"]) * 0.30 +
+            base_df["EAC"] * (base_df[f"E/W Rate (p/kWh) {term}m"] + base_df[f"E/W Uplift {term}m"]) * 0.20
+        ) / 100
+        base_df[f"TAC {term}m (£)"] = tac.round(2)
+    return base_df.reset_index(drop=True)
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the uplift table pivot builder.")
+    parser.add_argument("--mpxns", type=int, default=20_000)
+    parser.add_argument("--terms", type=int, nargs="+", default=[12, 24, 36])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = synthetic_long_frame(args.mpxns, args.terms)
+    legacy_s, legacy = best_of(lambda: legacy_build_uplift_editor(df, args.terms), args.repeat)
+    shared_s, shared = best_of(lambda: build_uplift_table(df, get_schema("NHH")), args.repeat)
+
+    if list(legacy.columns) != list(shared.columns):
+        raise SystemExit("Column layout differs")
+    for col in legacy.columns:
+        if not np.allclose(legacy[col].to_numpy(dtype=float), shared[col].to_numpy(dtype=float), equal_nan=True):
+            raise SystemExit(f"Mismatch in column {col!r}")
+
+    print(f"{len(df):,} rows, {args.mpxns:,} MPXNs, terms {args.terms}")
+    print(f"  per-term loop   {legacy_s * 1000:8.1f} ms")
+    print(f"  single pass     {shared_s * 1000:8.1f} ms  ({legacy_s / shared_s:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# bench_stages.py
+# Times each pipeline stage on synthetic tenders and appends the results to a
+# JSON history keyed by APP_VERSION, flagging stages that got slower since
+# the last recorded run of the same size. Run from the repo root:
+#     python -m benchmarks.bench_stages --mpxns 1000 10000 50000 200000 --terms 3 6
+# Workbooks are generated once into benchmarks/.data/ and reused.
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import time
+
+import pandas as pd
+
+from app.utils.classify import hh_mask, split_hh_nhh
+from app.utils.contract_length import add_contract_length
+from app.utils.file_loader import read_bytes, read_workbook
+from app.utils.formatter import convert_df
+from app.utils.pipeline import TAC_LABEL, pipeline_schema, table_terms, uplift_table
+from app.utils.versioning import APP_VERSION
+from benchmarks.synthetic import EXCEL_MAX_ROWS, synthetic_tender, tender_workbook
+
+HISTORY = os.path.join(os.path.dirname(__file__), "history.json")
+REGRESSION = 1.25  # flag stages more than 25% slower than the previous run...
+MIN_DELTA = 0.010  # ...and at least 10 ms slower, so timer noise on tiny stages isn't flagged
+
+
+def timed(stages, name, fn):
+    start = time.perf_counter()
+    result = fn()
+    stages[name] = round(time.perf_counter() - start, 4)
+    return result
+
+
+def run_stages(mpxns, terms, seed=0):
+    """Return {stage: seconds} for one tender size; read_excel is skipped past Excel's row limit."""
+    stages = {}
+    if mpxns * terms <= EXCEL_MAX_ROWS:
+        data = read_bytes(tender_workbook(mpxns, terms, seed))
+        frames, _, _ = timed(stages, "read_excel", lambda: read_workbook(data, sheets=["Standard"]))
+        df = frames["Standard"]
+    else:
+        df = synthetic_tender(mpxns, terms, seed=seed)
+
+    timed(stages, "contract_length", lambda: add_contract_length(df))
+    nhh, hh = timed(stages, "is_hh", lambda: split_hh_nhh(df, hh_mask(df)))
+    tables = timed(stages, "build_uplift_editor",
+                   lambda: {"NHH": uplift_table(nhh, "NHH"), "HH": uplift_table(hh, "HH")})
+
+    def reprice():
+        for meter_type, table in tables.items():
+            schema = pipeline_schema(meter_type)
+            for term in table_terms(table, TAC_LABEL):
+                schema.tac(table, term)
+
+    timed(stages, "tac", reprice)
+    timed(stages, "convert_df", lambda: convert_df(tables["NHH"]))
+    return stages, len(df)
+
+
+def load_history(path=HISTORY):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def previous_run(history, mpxns, terms):
+    for record in reversed(history):
+        if record["mpxns"] == mpxns and record["terms"] == terms:
+            return record
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time each pipeline stage on synthetic tenders.")
+    parser.add_argument("--mpxns", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--terms", type=int, nargs="+", default=[3, 6], help="Number of terms (3-6)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--history", default=HISTORY)
+    parser.add_argument("--no-record", action="store_true", help="Print results without appending to the history")
+    args = parser.parse_args()
+
+    history = load_history(args.history)
+    now = datetime.datetime.now().isoformat(timespec="seconds")
+    for mpxns in args.mpxns:
+        for terms in args.terms:
+            stages, rows = run_stages(mpxns, terms, args.seed)
+            before = previous_run(history, mpxns, terms)
+            print(f"{APP_VERSION} · {mpxns:,} MPXNs × {terms} terms ({rows:,} rows)")
+            for stage, seconds in stages.items():
+                line = f"  {stage:<20} {seconds * 1000:10.1f} ms"
+                if before and stage in before["stages"] and before["stages"][stage] > 0:
+                    ratio = seconds / before["stages"][stage]
+                    slower = ratio > REGRESSION and seconds - before["stages"][stage] > MIN_DELTA
+                    flag = "  ⚠️ slower" if slower else ""
+                    line += f"   {ratio:5.2f}x vs {before['version']}{flag}"
+                print(line)
+            history.append({
+                "version": APP_VERSION,
+                "timestamp": now,
+                "mpxns": mpxns,
+                "terms": terms,
+                "rows": rows,
+                "stages": stages,
+                "python": platform.python_version(),
+                "pandas": pd.__version__,
+            })
+
+    if not args.no_record:
+        with open(args.history, "w", encoding="utf-8") as fh:
+            json.dump(history, fh, indent=1)
+        print(f"Recorded in {args.history}")
+
+
+if __name__ == "__main__":
+    main()
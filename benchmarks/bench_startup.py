@@ -0,0 +1,53 @@
+# bench_startup.py
+# Measures cold start per page of the app/main.py entry point: each run is a
+# fresh interpreter that imports Streamlit and renders the page once (no
+# upload), which is what a broker waits for after a Render cold start.
+#     python -m benchmarks.bench_startup --pages broker uplift compare --repeat 3
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+at = AppTest.from_file("app/main.py", default_timeout=120)
+at.query_params["page"] = sys.argv[1]
+at.run()
+done = time.perf_counter()
+modules = [m for m in ("openpyxl", "xlsxwriter", "fpdf", "st_aggrid", "pyarrow") if m in sys.modules]
+print(json.dumps({"import": imported - start, "first_paint": done - imported,
+                  "errors": len(at.exception) + len(at.error), "heavy_modules": modules}))
+"""
+
+
+def cold_start(page):
+    """Return timings for one fresh-process render of page (seconds, plus the total process time)."""
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", PROBE, page], capture_output=True, text=True, check=True)
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result["process"] = time.perf_counter() - start
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time cold start and first paint of each app page.")
+    parser.add_argument("--pages", nargs="+", default=["broker", "uplift", "compare"])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for page in args.pages:
+        runs = [cold_start(page) for _ in range(args.repeat)]
+        median = {key: statistics.median(run[key] for run in runs) for key in ("import", "first_paint", "process")}
+        print(f"{page:<10} import {median['import'] * 1000:7.0f} ms · first paint {median['first_paint'] * 1000:7.0f} ms"
+              f" · process {median['process'] * 1000:7.0f} ms · errors {runs[-1]['errors']}"
+              f" · heavy modules loaded: {', '.join(runs[-1]['heavy_modules']) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
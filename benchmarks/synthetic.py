@@ -0,0 +1,86 @@
+# synthetic.py
+# Realistic synthetic supplier tenders: one row per MPXN x term, mixed HH and
+# NHH (E7 and E/W) meters, with the column names main10.py reads.
+
+import os
+
+import numpy as np
+import pandas as pd
+
+EXCEL_MAX_ROWS = 1_048_575  # data rows per sheet, after the header
+TERM_CHOICES = (12, 24, 36, 48, 60, 18)
+DATA_DIR = os.path.join(os.path.dirname(__file__), ".data")
+
+NHH_RATES = {"Day Rate (p/kWh)": (18, 32), "Night Rate (p/kWh)": (10, 20), "E/W Rate (p/kWh)": (9, 18)}
+HH_RATES = {
+    "All Year - Day Rate (p/kWh)": (18, 30),
+    "All Year - Night Rate (p/kWh)": (11, 19),
+    "DUoS (p/KVA/Day)": (1, 12),
+    "Metering Charge (p/day)": (20, 90),
+}
+COLUMNS = ["MPXN", "EAC", "CSD", "CED", "Standing Charge (p/day)"] + list(NHH_RATES) + list(HH_RATES)
+
+
+def synthetic_tender(mpxns, terms=3, hh_share=0.2, e7_share=0.3, seed=0):
+    """Return one tender sheet as a DataFrame; terms is a count (first n of TERM_CHOICES) or a list."""
+    rng = np.random.default_rng(seed)
+    terms = list(TERM_CHOICES[:terms]) if isinstance(terms, int) else list(terms)
+    n = mpxns * len(terms)
+
+    mpxn = np.repeat(1_000_000_000_000 + rng.choice(9 * 10 ** 12, mpxns, replace=False), len(terms))
+    is_hh = np.repeat(rng.random(mpxns) < hh_share, len(terms))
+    is_e7 = ~is_hh & np.repeat(rng.random(mpxns) < e7_share, len(terms))
+    eac = np.repeat(np.where(is_hh[::len(terms)], rng.integers(100_000, 2_000_000, mpxns),
+                             rng.integers(1_000, 100_000, mpxns)), len(terms))
+
+    # Contracts start on the 1st of a month and end the day before the anniversary
+    start = np.datetime64("2025-04") + np.repeat(rng.integers(0, 12, mpxns), len(terms)).astype("timedelta64[M]")
+    term = np.tile(terms, mpxns)
+    end = (start + term.astype("timedelta64[M]")).astype("datetime64[D]") - np.timedelta64(1, "D")
+
+    df = pd.DataFrame({
+        "MPXN": mpxn.astype(str),
+        "EAC": eac,
+        "CSD": pd.to_datetime(start.astype("datetime64[D]")).strftime("%d/%m/%Y"),
+        "CED": pd.to_datetime(end).strftime("%d/%m/%Y"),
+        "Standing Charge (p/day)": rng.uniform(20, 120, n).round(3),
+    })
+    for col, (low, high) in NHH_RATES.items():
+        values = rng.uniform(low, high, n).round(3)
+        blank = is_hh | (is_e7 if col == "E/W Rate (p/kWh)" else False)
+        df[col] = np.where(blank, np.nan, values)
+    for col, (low, high) in HH_RATES.items():
+        df[col] = np.where(is_hh, rng.uniform(low, high, n).round(3), np.nan)
+    return df[COLUMNS]
+
+
+def write_workbook(sheets, path):
+    """Write {sheet: DataFrame} to an xlsx file with xlsxwriter in constant-memory mode."""
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True, "nan_inf_to_errors": True})
+    for name, df in sheets.items():
+        if len(df) > EXCEL_MAX_ROWS:
+            raise ValueError(f"{name}: {len(df):,} rows exceed the Excel sheet limit")
+        sheet = workbook.add_worksheet(name)
+        sheet.write_row(0, 0, list(df.columns))
+        columns = [df[c].astype(object).where(df[c].notna(), None).tolist() for c in df.columns]
+        for i, row in enumerate(zip(*columns), start=1):
+            sheet.write_row(i, 0, row)
+    workbook.close()
+    return path
+
+
+def tender_workbook(mpxns, terms=3, seed=0, data_dir=DATA_DIR):
+    """Return the path of a cached Standard/Green synthetic workbook, generating it on first use."""
+    os.makedirs(data_dir, exist_ok=True)
+    path = os.path.join(data_dir, f"tender_{mpxns}_{terms}_{seed}.xlsx")
+    if not os.path.exists(path):
+        standard = synthetic_tender(mpxns, terms, seed=seed)
+        green = standard.copy()
+        rate_cols = [c for c in COLUMNS[4:]]
+        green[rate_cols] = (green[rate_cols] * 1.02).round(3)
+        tmp = path + ".tmp"
+        write_workbook({"Standard": standard, "Green": green}, tmp)
+        os.replace(tmp, path)
+    return path
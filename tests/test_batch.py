@@ -0,0 +1,76 @@
+# test_batch.py
+# The headless batch CLI: finds tender workbooks, prices each one on the
+# process pool with optional rules, and reports failures in its exit code.
+
+import zipfile
+
+import pandas as pd
+import pytest
+
+from app import batch
+
+
+def write_tender(path, rows=6):
+    """A small NHH tender with 12m and 24m quotes and a blank Green sheet."""
+    df = pd.DataFrame({
+        "MPXN": [1_000 + i // 2 for i in range(rows)],
+        "EAC": 10_000.0,
+        "CSD": "01/04/2025",
+        "CED": ["31/03/2026", "31/03/2027"] * (rows // 2),
+        "Standing Charge (p/day)": 30.0,
+        "Day Rate (p/kWh)": 20.0,
+        "Night Rate (p/kWh)": 15.0,
+    })
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        df.to_excel(writer, sheet_name="Standard", index=False)
+        pd.DataFrame().to_excel(writer, sheet_name="Green", index=False)
+
+
+@pytest.fixture
+def tenders(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # The tender cache and default output land in the temp dir
+    folder = tmp_path / "tenders"
+    folder.mkdir()
+    write_tender(folder / "alpha.xlsx")
+    write_tender(folder / "beta.xlsx")
+    (folder / "~$alpha.xlsx").write_bytes(b"lock file")
+    (folder / "notes.txt").write_text("not a tender")
+    return folder
+
+
+def test_find_tenders_skips_lock_files(tenders):
+    found = batch.find_tenders([str(tenders), "extra.xlsx"])
+    assert [p.rsplit("/", 1)[-1] for p in found] == ["alpha.xlsx", "beta.xlsx", "extra.xlsx"]
+
+
+def test_prices_every_tender_with_rules(tenders, tmp_path, capsys):
+    rules = tmp_path / "rules.csv"
+    rules.write_text("meter_type,term,component,uplift\nNHH,24,Day,1.5\n")
+    out = tmp_path / "priced"
+
+    code = batch.main([str(tenders), "--rules", str(rules), "--out", str(out), "--format", "CSV (.csv)",
+                       "--workers", "1"])
+    assert code == 0
+    assert sorted(p.name for p in out.iterdir()) == ["alpha_priced.zip", "beta_priced.zip"]
+    printed = capsys.readouterr()
+    assert "Priced 2/2 tenders" in printed.out and "'Green'" in printed.err
+
+    with zipfile.ZipFile(out / "alpha_priced.zip") as bundle:
+        (name,) = bundle.namelist()
+        table = pd.read_csv(bundle.open(name))
+    assert name.startswith("Standard_NHH")
+    assert table["Day Uplift 24m"].tolist() == [1.5, 1.5, 1.5]
+    assert table["Day Uplift 12m"].tolist() == [0.0, 0.0, 0.0]
+
+
+def test_failures_set_the_exit_code(tenders, tmp_path, capsys):
+    broken = tmp_path / "broken.xlsx"
+    broken.write_bytes(b"not a workbook")
+    code = batch.main([str(tenders / "alpha.xlsx"), str(broken), "--out", str(tmp_path / "out"), "--workers", "1"])
+    assert code == 1
+    assert "✗" in capsys.readouterr().err
+
+
+def test_no_tenders_is_a_usage_error(tmp_path):
+    with pytest.raises(SystemExit):
+        batch.main([str(tmp_path)])
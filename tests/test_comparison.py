@@ -0,0 +1,54 @@
+# test_comparison.py
+# Supplier ranking on synthetic tenders, including E7 meters with no E/W rate.
+
+import numpy as np
+import pandas as pd
+
+from app.utils.comparison import compare_suppliers, supplier_tacs
+
+RATES = ["Standing Charge (p/day)", "Day Rate (p/kWh)", "Night Rate (p/kWh)", "E/W Rate (p/kWh)"]
+
+
+def tender(scale=1.0):
+    """Three NHH meters on 12m and 24m; meter 1002 is E7 (E/W rate left blank)."""
+    rows = []
+    for mpxn, eac, ew in [("1001", 15_000.0, 12.0), ("1002", 9_000.0, np.nan), ("1003", 22_000.0, 11.5)]:
+        for ced in ("31/03/2026", "31/03/2027"):
+            rows.append({"MPXN": mpxn, "EAC": eac, "CSD": "01/04/2025", "CED": ced,
+                         "Standing Charge (p/day)": 40.0, "Day Rate (p/kWh)": 24.0,
+                         "Night Rate (p/kWh)": 16.0, "E/W Rate (p/kWh)": ew})
+    df = pd.DataFrame(rows)
+    df[RATES] = df[RATES] * scale
+    return df
+
+
+def test_cheaper_supplier_wins_every_pair():
+    priced = {"A": supplier_tacs(tender()), "B": supplier_tacs(tender(0.9))}
+    result = compare_suppliers(priced)
+
+    assert len(result) == 6
+    assert (result["Quotes"] == 2).all()
+    assert (result["Cheapest Supplier"] == "B").all()
+    assert (result["Cheapest TAC (£)"] > 0).all()
+    np.testing.assert_allclose(result["Margin Delta (%)"], 11.11, atol=0.02)
+
+
+def test_blank_eac_pair_is_not_quoted():
+    df = tender()
+    df.loc[df["MPXN"] == "1003", "EAC"] = np.nan
+    tacs = supplier_tacs(df)
+    assert "1003" not in tacs.index.get_level_values("MPXN")
+    assert np.isfinite(tacs["TAC"]).all()
+
+
+def test_numeric_and_text_mpxns_line_up():
+    numeric = tender().assign(MPXN=lambda df: df["MPXN"].astype(int))
+    # One stray text MPXN keeps this supplier's keys as text
+    text = pd.concat([tender(0.9), tender(0.9).head(1).assign(MPXN="S 1004")], ignore_index=True)
+    result = compare_suppliers({"A": supplier_tacs(numeric), "B": supplier_tacs(text)})
+
+    paired = result[result["MPXN"] != "S 1004"]
+    assert len(paired) == 6
+    assert (paired["Quotes"] == 2).all()
+    assert (paired["Cheapest Supplier"] == "B").all()
+    assert result.loc[result["MPXN"] == "S 1004", "Quotes"].tolist() == [1]
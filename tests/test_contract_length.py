@@ -0,0 +1,49 @@
+# test_contract_length.py
+# The vectorised month_span must agree with dateutil's relativedelta, and
+# parse_dates must read day-first and ISO text dates alike.
+
+import datetime
+
+import numpy as np
+import pandas as pd
+from dateutil.relativedelta import relativedelta
+
+from app.utils.contract_length import month_span, parse_dates
+
+
+def reference_months(start, end):
+    """Whole months from start to end inclusive, per relativedelta."""
+    span = relativedelta(end + datetime.timedelta(days=1), start)
+    return span.years * 12 + span.months
+
+
+def test_month_span_matches_relativedelta_on_random_spans():
+    rng = np.random.default_rng(3)
+    starts = np.datetime64("2018-01-01") + rng.integers(0, 3_000, 20_000).astype("timedelta64[D]")
+    ends = starts + rng.integers(0, 2_200, len(starts)).astype("timedelta64[D]")
+    expected = [reference_months(s, e) for s, e in zip(starts.tolist(), ends.tolist())]
+    np.testing.assert_array_equal(month_span(starts, ends), np.array(expected, dtype=float))
+
+
+def test_month_end_starts_and_leap_years():
+    cases = [("2025-04-01", "2026-03-31"), ("2024-08-31", "2025-02-27"), ("2023-08-31", "2024-02-28"),
+             ("2024-02-29", "2025-02-27"), ("2024-01-31", "2024-02-28"), ("2024-01-30", "2024-02-29")]
+    starts = np.array([s for s, _ in cases], dtype="datetime64[D]")
+    ends = np.array([e for _, e in cases], dtype="datetime64[D]")
+    expected = [reference_months(s, e) for s, e in zip(starts.tolist(), ends.tolist())]
+    np.testing.assert_array_equal(month_span(starts, ends), np.array(expected, dtype=float))
+    assert expected[0] == 12
+
+
+def test_missing_dates_are_nan():
+    starts = np.array(["2025-04-01", "NaT"], dtype="datetime64[D]")
+    ends = np.array(["NaT", "2026-03-31"], dtype="datetime64[D]")
+    assert np.isnan(month_span(starts, ends)).all()
+
+
+def test_parse_dates_reads_iso_and_day_first_text():
+    values = pd.Series(["2025-06-01", "01/06/2025", "2025-06-13 00:00:00", " 13/06/2025 ",
+                        datetime.datetime(2025, 6, 1), "not a date", None, 45_000.0], dtype=object)
+    expected = np.array(["2025-06-01", "2025-06-01", "2025-06-13", "2025-06-13", "2025-06-01", "NaT", "NaT", "NaT"],
+                        dtype="datetime64[ns]")
+    np.testing.assert_array_equal(parse_dates(values), expected)
@@ -0,0 +1,46 @@
+# test_cost_calc.py
+# The columnar TAC engine must match the per-row reference it replaced bit for bit.
+
+import numpy as np
+import pandas as pd
+
+from app.utils.cost_calc import build_broker_output, calculate_annual_cost
+from app.utils.tariff_schema import get_schema
+
+TERMS = ("12", "24", "36")
+
+
+def wide_table(rows=5_000, seed=11):
+    """A random STANDARD uplift table with 3 dp rates and uplifts, some terms left blank."""
+    rng = np.random.default_rng(seed)
+    data = {"MPXN": np.arange(rows).astype(str), "EAC": rng.integers(0, 250_000, rows).astype(float)}
+    for term in TERMS:
+        data[f"Standing Charge (p/day) {term}m"] = rng.integers(0, 200_000, rows) / 1000
+        data[f"Standard Rate (p/kWh) {term}m"] = rng.integers(0, 60_000, rows) / 1000
+        data[f"S/C Uplift {term}m"] = rng.integers(0, 5_000, rows) / 1000
+        data[f"Unit Rate Uplift {term}m"] = rng.integers(0, 3_000, rows) / 1000
+    # The 36m term is only quoted on some tenders: its columns are missing altogether
+    return pd.DataFrame({k: v for k, v in data.items() if "36m" not in k})
+
+
+def reference_tac(row, term):
+    """The per-row loop main1 used before the columnar engine."""
+    sc = row.get(f"Standing Charge (p/day) {term}m", 0) + row.get(f"S/C Uplift {term}m", 0)
+    ur = row.get(f"Standard Rate (p/kWh) {term}m", 0) + row.get(f"Unit Rate Uplift {term}m", 0)
+    return calculate_annual_cost(sc, ur, row["EAC"])
+
+
+def test_columnar_tac_matches_row_reference_exactly():
+    table = wide_table()
+    out = build_broker_output(table, {"MPXN": "MPXN"}, get_schema("STANDARD"), terms=TERMS)
+    for term in TERMS:
+        expected = [reference_tac(row, term) for row in table.to_dict("records")]
+        np.testing.assert_array_equal(out[f"TAC {term}m (£)"].to_numpy(), np.array(expected))
+
+
+def test_half_penny_ties_round_like_python():
+    # 36290.975 is stored just below .975; np.round alone would round it up
+    table = pd.DataFrame({"MPXN": ["1"], "EAC": [1.0], "Standing Charge (p/day) 12m": [0.0],
+                          "Standard Rate (p/kWh) 12m": [3_629_097.5]})
+    out = build_broker_output(table, {"MPXN": "MPXN"}, get_schema("STANDARD"), terms=("12",))
+    assert out["TAC 12m (£)"].iat[0] == calculate_annual_cost(0.0, 3_629_097.5, 1.0)
@@ -0,0 +1,80 @@
+# test_dtypes.py
+# Compaction must never change a price: only keys and terms are narrowed.
+# Also covers the converters and memory helpers behind the sidebar report.
+
+import numpy as np
+import pandas as pd
+
+from app.utils.dtypes import (as_float64, compact_key, compact_table, compact_tender, compact_term, format_bytes,
+                              frame_memory, session_memory)
+from app.utils.incremental import apply_edits
+from app.utils.tariff_schema import get_schema
+
+
+def test_rates_and_uplifts_stay_float64():
+    table = pd.DataFrame({"MPXN": ["1001"], "EAC": [2_000_000.0], "Standing Charge (p/day) 12m": [87.951],
+                          "Standard Rate (p/kWh) 12m": [21.92], "S/C Uplift 12m": [np.nan],
+                          "Unit Rate Uplift 12m": [0.0], "TAC 12m (£)": [0.0]})
+    compact = compact_table(table, fill=0)
+    assert (compact.drop(columns="MPXN").dtypes == np.float64).all()
+    assert compact["Standing Charge (p/day) 12m"].iat[0] == 87.951
+    assert compact["S/C Uplift 12m"].iat[0] == 0.0
+
+
+def test_small_uplift_edit_prices_like_float64():
+    schema = get_schema("STANDARD")
+    table = compact_table(pd.DataFrame({
+        "MPXN": ["1001"], "EAC": [2_000_000.0], "Standing Charge (p/day) 12m": [0.0],
+        "Standard Rate (p/kWh) 12m": [20.005], "S/C Uplift 12m": [0.0], "Unit Rate Uplift 12m": [0.0],
+        "TAC 12m (£)": [0.0]}))
+    table, _ = apply_edits(table, {"edited_rows": {0: {"Unit Rate Uplift 12m": 0.00125}}}, schema, "TAC {term}m (£)")
+    assert table["TAC 12m (£)"].iat[0] == round(2_000_000.0 * (20.005 + 0.00125) / 100, 2)
+
+
+def test_compact_key_keeps_text_mpxns_as_text():
+    text = compact_key(pd.Series(["1200012345678", "0123", "1200012345679"]))
+    assert isinstance(text.dtype, pd.CategoricalDtype)
+    assert list(text) == ["1200012345678", "0123", "1200012345679"]
+
+    assert compact_key(pd.Series([1200012345678.0, 1200012345679.0])).dtype == np.int64
+    assert compact_key(pd.Series([1200012345678, 1200012345679])).dtype == np.int64
+
+
+def test_compact_term():
+    assert compact_term(pd.Series(["12", 24.0, 36])).dtype == np.int8
+    assert compact_term(pd.Series(["12", None])).dtype != np.int8
+
+
+def test_compact_key_leaves_fractional_and_blank_floats():
+    assert compact_key(pd.Series([1.5, 2.0])).dtype == np.float64
+    assert compact_key(pd.Series([1.0, np.nan])).dtype == np.float64
+    categorical = pd.Series(["a", "b"], dtype="category")
+    assert compact_key(categorical) is categorical
+
+
+def test_as_float64_coerces_and_fills():
+    values = as_float64(pd.Series(["1.25", "N/A", None, 3]))
+    assert values.dtype == np.float64 and np.isnan(values[1:3]).all() and values[3] == 3.0
+    assert as_float64(pd.Series([np.nan, 2.5]), fill=0).tolist() == [0.0, 2.5]
+
+
+def test_compact_table_keeps_text_columns_and_index():
+    table = pd.DataFrame({"MPXN": [1001, 1002], "Company": ["A", "B"], "EAC": [1, 2]}, index=[5, 6])
+    compact = compact_table(table)
+    assert compact["MPXN"].dtype == np.int64 and compact["EAC"].dtype == np.float64
+    assert compact["Company"].tolist() == ["A", "B"] and list(compact.index) == [5, 6]
+
+
+def test_compact_tender_in_place():
+    df = pd.DataFrame({"MPXN": ["0123", "0123", "0456"], "Contract Length": [12.0, 24.0, 36.0]})
+    assert compact_tender(df) is df
+    assert isinstance(df["MPXN"].dtype, pd.CategoricalDtype) and list(df["MPXN"]) == ["0123", "0123", "0456"]
+    assert df["Contract Length"].dtype == np.int8
+
+
+def test_memory_helpers():
+    df = pd.DataFrame({"EAC": np.zeros(128)})
+    assert frame_memory(df) >= 128 * 8
+    assert session_memory({"a": df, "b": df, "c": "not a frame"}) == 2 * frame_memory(df)
+    sizes = (512, 2048, 3 * 1024 ** 2, 5 * 1024 ** 4)
+    assert [format_bytes(n) for n in sizes] == ["512 B", "2.0 KB", "3.0 MB", "5120.0 GB"]
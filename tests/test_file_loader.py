@@ -0,0 +1,98 @@
+# test_file_loader.py
+# Tender disk cache: entries are keyed by cache schema, so stale frames are never served.
+# Header validation is per sheet: one bad sheet is skipped, not the whole upload.
+
+import json
+import os
+from io import BytesIO
+
+import pandas as pd
+import pytest
+
+from app.utils import file_loader
+from app.utils.tender_columns import MissingColumnsError
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_loader, "CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def frames():
+    return {"Standard": pd.DataFrame({"MPXN": ["1001", "1002"], "EAC": [1_000.0, 2_500.0]})}
+
+
+def test_round_trip_records_schema_and_parser(cache_dir):
+    file_loader.write_cached("abc", frames(), parser="workbook")
+    sheets, _, skipped = file_loader.read_cached("abc")
+    pd.testing.assert_frame_equal(sheets["Standard"], frames()["Standard"])
+
+    with open(os.path.join(file_loader._entry_dir("abc"), file_loader.MANIFEST), encoding="utf-8") as fh:
+        manifest = json.load(fh)
+    assert manifest["schema"] == file_loader.CACHE_SCHEMA
+    assert manifest["parser"] == "workbook"
+    assert skipped == {}
+
+
+def test_entries_from_another_schema_are_misses(cache_dir, monkeypatch):
+    # Pre-versioning layout: digest-only directory with a flat {sheet: file} manifest
+    legacy = cache_dir / "abc"
+    legacy.mkdir()
+    frames()["Standard"].to_pickle(legacy / "sheet0.pkl")
+    (legacy / file_loader.MANIFEST).write_text(json.dumps({"Standard": "sheet0.pkl"}))
+    assert file_loader.read_cached("abc") is None
+
+    file_loader.write_cached("abc", frames(), parser="chunked")
+    monkeypatch.setattr(file_loader, "CACHE_SCHEMA", file_loader.CACHE_SCHEMA + 1)
+    assert file_loader.read_cached("abc") is None
+
+
+def tender_bytes(green=None):
+    """A Standard sheet with an "N/A" rate, and a Green sheet (blank by default)."""
+    standard = pd.DataFrame({
+        "MPXN": [1001, 1002], "EAC": [1_000.0, 2_500.0], "CSD": ["01/04/2025"] * 2, "CED": ["31/03/2026"] * 2,
+        "Standing Charge (p/day)": [30.5, "N/A"], "Day Rate (p/kWh)": [21.25, 22.5],
+    })
+    out = BytesIO()
+    with pd.ExcelWriter(out, engine="openpyxl") as writer:
+        standard.to_excel(writer, sheet_name="Standard", index=False)
+        (green if green is not None else pd.DataFrame()).to_excel(writer, sheet_name="Green", index=False)
+    return out.getvalue()
+
+
+def test_invalid_sheet_is_skipped_not_raised():
+    frames, timings, skipped = file_loader.read_workbook(tender_bytes())
+
+    assert list(frames) == list(timings) == ["Standard"]
+    assert frames["Standard"]["Standing Charge (p/day)"].isna().tolist() == [False, True]
+    assert isinstance(skipped["Green"], MissingColumnsError)
+    assert "MPXN" in skipped["Green"].missing
+
+
+def test_skipped_sheets_survive_the_caches(cache_dir):
+    green = pd.DataFrame({"MPXN": [1001], "Notes": ["no rates"]})
+    digest, frames, _, skipped = file_loader.load_tender(tender_bytes(green))
+    assert list(frames) == ["Standard"] and list(skipped) == ["Green"]
+
+    cached_frames, _, cached_skipped = file_loader.read_cached(digest)
+    assert list(cached_frames) == ["Standard"]
+    assert cached_skipped["Green"].missing == skipped["Green"].missing
+    _, _, _, shared_skipped = file_loader.load_tender(tender_bytes(green))
+    assert list(shared_skipped) == ["Green"]
+
+    with pytest.raises(MissingColumnsError):
+        file_loader.load_supplier_data(tender_bytes(green), "Green")
+
+
+def test_uploads_are_hashed_once_per_session(cache_dir, monkeypatch):
+    class Upload(BytesIO):
+        file_id = "upload-1"
+
+    hashes = []
+    monkeypatch.setattr(file_loader, "file_hash", lambda data: hashes.append(1) or "digest-1")
+    digests = {}
+    for _ in range(2):
+        digest, frames, _, _ = file_loader.load_tender(Upload(tender_bytes()), digests=digests)
+    assert digest == "digest-1" and list(frames) == ["Standard"]
+    assert len(hashes) == 1
@@ -0,0 +1,62 @@
+# test_incremental.py
+# The uplift table's first-render TAC must match what an incremental reprice gives.
+
+import numpy as np
+import pandas as pd
+
+from app.utils.incremental import apply_edits
+from app.utils.pipeline import TAC_LABEL, uplift_table
+from app.utils.tariff_schema import get_schema
+
+
+def nhh_tender():
+    """Two NHH meters on 12m: a standard three-rate meter and an E7 meter with no E/W rate."""
+    return pd.DataFrame({
+        "MPXN": ["1000000000001", "1000000000002"],
+        "EAC": [12_000.0, 8_500.0],
+        "Contract Length": ["12", "12"],
+        "Standing Charge (p/day)": [45.5, 38.25],
+        "Day Rate (p/kWh)": [24.1, 26.3],
+        "Night Rate (p/kWh)": [18.2, 15.9],
+        "E/W Rate (p/kWh)": [21.7, np.nan],
+    })
+
+
+def test_zero_uplift_edit_leaves_tac_unchanged():
+    table = uplift_table(nhh_tender(), "NHH")
+    before = table["TAC_12m"].to_numpy().copy()
+    assert (before > 0).all()
+
+    delta = {"edited_rows": {row: {"Day Uplift 12m": 0.0} for row in range(len(table))}}
+    table, touched = apply_edits(table, delta, get_schema("NHH"), TAC_LABEL)
+
+    assert touched == {(0, "12"), (1, "12")}
+    np.testing.assert_array_equal(table["TAC_12m"].to_numpy(), before)
+
+
+def test_blank_rate_priced_as_zero():
+    table = uplift_table(nhh_tender(), "NHH")
+    e7 = table.iloc[1]
+    expected = round((38.25 * 365 + 8_500.0 * (26.3 * 0.5 + 15.9 * 0.3)) / 100, 2)
+    assert e7["E/W Rate (p/kWh) 12m"] == 0
+    assert e7["TAC_12m"] == expected
+
+
+def test_pipeline_hh_excludes_metering():
+    hh = pd.DataFrame({
+        "MPXN": ["2000000000001"], "EAC": [100_000.0], "Contract Length": ["12"],
+        "Standing Charge (p/day)": [120.0], "All Year - Day Rate (p/kWh)": [22.0],
+        "All Year - Night Rate (p/kWh)": [17.0], "DUoS (p/KVA/Day)": [3.5], "Metering Charge (p/day)": [40.0],
+    })
+    table = uplift_table(hh, "HH")
+    assert not any("Metering" in col for col in table.columns)
+    assert table["TAC_12m"].iat[0] == round((120.0 * 365 + 3.5 * 365 + 100_000.0 * (22.0 * 0.7 + 17.0 * 0.3)) / 100, 2)
+
+
+def test_first_non_blank_eac_per_mpxn():
+    df = nhh_tender()
+    df = pd.concat([df.assign(EAC=[np.nan, np.nan]), df.assign(EAC=[5_000.0, np.nan])], ignore_index=True)
+    table = uplift_table(df, "NHH")
+    assert table["EAC"].iat[0] == 5_000.0
+    # No EAC on any row: left blank rather than priced on 0 kWh
+    assert np.isnan(table["EAC"].iat[1]) and np.isnan(table["TAC_12m"].iat[1])
@@ -0,0 +1,132 @@
+# test_ingest.py
+# The chunked reader must give the same frames as the openpyxl path, and hand
+# unusual sheet XML back to it.
+
+import re
+import zipfile
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.utils import file_loader
+from app.utils.classify import hh_mask
+from app.utils.contract_length import add_contract_length
+from app.utils.ingest import SheetLayoutError, read_workbook_chunked, sheet_members
+
+MAIN_NS = b"http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+
+
+def tender_bytes(rows=400, seed=7):
+    """A Standard/Green tender with NHH, E7 and HH meters, text and real dates, and blank rates."""
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2025-04-01")
+    ends = [start + pd.DateOffset(months=m) - pd.Timedelta(days=1) for m in (12, 24, 36)]
+    df = pd.DataFrame({
+        "MPXN": 1_000_000_000_000 + np.arange(rows) // 3,
+        "EAC": rng.integers(1_000, 90_000, rows).astype(float),
+        "CSD": [start] * rows,
+        "CED": [ends[i % 3] for i in range(rows)],
+        "Standing Charge (p/day)": rng.uniform(20, 60, rows).round(2),
+        "Day Rate (p/kWh)": rng.uniform(15, 30, rows).round(3),
+        "Night Rate (p/kWh)": rng.uniform(10, 20, rows).round(3),
+        "E/W Rate (p/kWh)": np.where(rng.random(rows) < 0.3, np.nan, rng.uniform(10, 20, rows).round(3)),
+        "All Year - Day Rate (p/kWh)": np.nan,
+        "All Year - Night Rate (p/kWh)": np.nan,
+        "DUoS (p/KVA/Day)": np.nan,
+        "Notes": "ignored",
+    })
+    hh = rng.random(rows) < 0.2
+    df.loc[hh, ["All Year - Day Rate (p/kWh)", "All Year - Night Rate (p/kWh)", "DUoS (p/KVA/Day)"]] = [22.0, 17.0, 3.5]
+    # Some suppliers type dates as text
+    df["CSD"] = df["CSD"].astype(object)
+    df.loc[::5, "CSD"] = "01/04/2025"
+
+    out = BytesIO()
+    with pd.ExcelWriter(out, engine="openpyxl") as writer:
+        df.to_excel(writer, sheet_name="Standard", index=False)
+        df.assign(**{"Day Rate (p/kWh)": df["Day Rate (p/kWh)"] + 0.5}).to_excel(writer, sheet_name="Green", index=False)
+    return out.getvalue()
+
+
+def prefixed(data):
+    """Rewrite every worksheet's XML with an x: namespace prefix, as some writers do."""
+    source = zipfile.ZipFile(BytesIO(data))
+    sheets = set(sheet_members(source).values())
+    out = BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as target:
+        for item in source.infolist():
+            content = source.read(item.filename)
+            if item.filename in sheets:
+                content = content.replace(b'xmlns="' + MAIN_NS + b'"', b'xmlns:x="' + MAIN_NS + b'"')
+                content = re.sub(rb"<(/?)(?![?!])([A-Za-z]+)([\s/>])", rb"<\1x:\2\3", content)
+            target.writestr(item, content)
+    return out.getvalue()
+
+
+def derived(frame):
+    """What the pipeline sees after prepare_sheet: parsed dates, Contract Length and Is_HH."""
+    frame = frame.copy()
+    add_contract_length(frame)
+    frame["Is_HH"] = hh_mask(frame)
+    return frame
+
+
+def test_chunked_matches_openpyxl():
+    data = tender_bytes()
+    expected, _, _ = file_loader.read_workbook(data)
+    # Small blocks so every sheet is split across several worker tasks
+    chunked, _, _ = read_workbook_chunked(data, chunk_bytes=16 * 1024, workers=2)
+
+    assert list(chunked) == list(expected)
+    for sheet in expected:
+        pd.testing.assert_frame_equal(chunked[sheet], derived(expected[sheet]))
+
+
+def test_prefixed_sheet_xml_raises_layout_error():
+    with pytest.raises(SheetLayoutError):
+        read_workbook_chunked(prefixed(tender_bytes(rows=30)), workers=1)
+
+
+def test_prefixed_sheet_xml_falls_back_to_openpyxl(monkeypatch):
+    data = prefixed(tender_bytes(rows=30))
+    monkeypatch.setattr(file_loader, "CHUNKED_MIN_BYTES", 0)
+
+    frames, _, _, parser = file_loader.parse_workbook(data)
+    expected, _, _ = file_loader.read_workbook(data)
+    assert parser == "workbook"
+    for sheet in expected:
+        pd.testing.assert_frame_equal(frames[sheet], expected[sheet])
+
+
+def gappy_bytes(rows=120):
+    """A Standard sheet with text MPXNs ("0123") and blank rows, some spanning block boundaries."""
+    import openpyxl
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Standard"
+    ws.append(["MPXN", "EAC", "CSD", "CED", "Standing Charge (p/day)", "Day Rate (p/kWh)"])
+    for i in range(rows):
+        if i % 7 == 3:
+            ws.append([])
+            ws.append([None, None])
+        mpxn = f"0{1000 + i}" if i % 2 else 2000 + i
+        ws.append([mpxn, 1000.0 + i, "01/04/2025", "31/03/2026", 30.5, 21.25])
+    ws.append([])
+    out = BytesIO()
+    wb.save(out)
+    return out.getvalue()
+
+
+def test_chunked_keeps_text_mpxns_and_blank_rows():
+    data = gappy_bytes()
+    expected, _, _ = file_loader.read_workbook(data)
+    chunked, _, _ = read_workbook_chunked(data, chunk_bytes=1024, workers=1)
+
+    frame = chunked["Standard"]
+    pd.testing.assert_frame_equal(frame, derived(expected["Standard"]))
+    assert list(frame["MPXN"].iloc[:2]) == ["2000", "01001"]
+    # Row 5 of the sheet (index 3) is blank, so the next quote is on Excel row 7
+    assert frame["MPXN"].iloc[3:5].isna().all() and frame["MPXN"].iloc[5] == "01003"
@@ -0,0 +1,23 @@
+# test_instrumentation.py
+# Stage records must actually be emitted at INFO, not dropped by the default WARNING level.
+
+import json
+import logging
+
+from app.utils.instrumentation import logger, stage, start_run
+
+
+def test_stage_logger_emits_info(caplog):
+    assert logger.isEnabledFor(logging.INFO)
+    assert logger.handlers
+
+    logger.propagate = True  # Let caplog see the records for this test
+    try:
+        with caplog.at_level(logging.INFO, logger=logger.name):
+            start_run()
+            with stage("pivot", rows_in=10) as record:
+                record["rows_out"] = 4
+    finally:
+        logger.propagate = False
+    records = [json.loads(r.getMessage()) for r in caplog.records if r.name == logger.name]
+    assert any(r.get("stage") == "pivot" and r.get("rows_out") == 4 for r in records)
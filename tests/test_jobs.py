@@ -0,0 +1,78 @@
+# test_jobs.py
+# Background export jobs: queued -> running -> done | failed, with progress,
+# and finished jobs forgotten once they outlive their TTL.
+
+import threading
+import time
+
+from app.utils import jobs
+
+
+def wait(job_id, timeout=5.0):
+    deadline = time.time() + timeout
+    while jobs.get(job_id).active:
+        if time.time() > deadline:
+            raise TimeoutError(job_id)
+        time.sleep(0.01)
+    return jobs.get(job_id)
+
+
+def test_job_lifecycle_and_result_tuple():
+    release = threading.Event()
+    seen = []
+
+    def export(frame_rows, progress):
+        progress(0.5, "Half way")
+        seen.append(True)
+        release.wait(5)
+        return b"data", f"{frame_rows} rows", "out.csv", "text/csv"
+
+    job_id = jobs.submit("Export", export, 3, file_name="ignored.bin")
+    job = jobs.get(job_id)
+    while not seen:
+        time.sleep(0.01)
+    assert job.status == "running" and (job.progress, job.message) == (0.5, "Half way")
+
+    release.set()
+    job = wait(job_id)
+    assert (job.status, job.progress, job.message) == ("done", 1.0, "Ready")
+    assert (job.result, job.preview, job.file_name, job.mime) == (b"data", "3 rows", "out.csv", "text/csv")
+    assert job.finished >= job.created
+
+
+def test_failed_job_records_error():
+    def broken(progress):
+        raise RuntimeError("disk full")
+
+    job = wait(jobs.submit("Broken", broken, file_name="x.zip"))
+    assert job.status == "failed" and job.error == "RuntimeError: disk full" and job.result is None
+
+
+def test_progress_is_clamped():
+    job = jobs.Job("Clamp")
+    job.update(1.7)
+    assert job.progress == 1.0
+    job.update(-1, "Starting")
+    assert (job.progress, job.message) == (0.0, "Starting")
+
+
+def test_prune_forgets_only_expired_finished_jobs():
+    done = wait(jobs.submit("Old", lambda progress: b"old"))
+    done.finished -= 10
+    running = jobs.Job("Running")
+    with jobs._lock:
+        jobs._jobs[running.id] = running
+
+    jobs.prune(ttl=5)
+    assert jobs.get(done.id) is None
+    assert jobs.get(running.id) is running
+
+    state = {"export_jobs": [done.id, running.id]}
+    assert jobs.session_jobs(state) == [running.id] == state["export_jobs"]
+    with jobs._lock:
+        del jobs._jobs[running.id]
+
+
+def test_plain_bytes_result_keeps_submitted_file_name():
+    job = wait(jobs.submit("Bytes", lambda progress: b"raw", file_name="a.bin", mime="application/octet-stream"))
+    assert (job.result, job.preview, job.file_name) == (b"raw", None, "a.bin")
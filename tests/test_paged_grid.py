@@ -0,0 +1,56 @@
+# test_paged_grid.py
+# The paged grid shows a filtered page of one term; its edits must land on the
+# right rows of the full frame and reprice only those MPXN/terms.
+
+import numpy as np
+import pandas as pd
+
+from app.utils.incremental import apply_edits
+from app.utils.paged_grid import filter_rows, page_delta, term_columns
+from app.utils.tariff_schema import get_schema
+
+SCHEMA = get_schema("STANDARD")
+TAC_LABEL = "TAC {term}m (£)"
+TERMS = ("12", "24")
+
+
+def priced(rows=10):
+    data = {"MPXN": [f"{1200000000000 + i}" for i in range(rows)], "EAC": np.arange(1, rows + 1) * 1_000.0}
+    for term in TERMS:
+        for c in SCHEMA.components:
+            data[SCHEMA.rate_column(c, term)] = 10.0
+            data[SCHEMA.uplift_column(c, term)] = 0.0
+        data[TAC_LABEL.format(term=term)] = SCHEMA.tac(pd.DataFrame(data), term)
+    return pd.DataFrame(data)
+
+
+def test_term_columns_keep_shared_columns_and_one_term():
+    assert term_columns(priced().columns, SCHEMA, TAC_LABEL, "24") == [
+        "MPXN", "EAC", "Standing Charge (p/day) 24m", "S/C Uplift 24m",
+        "Standard Rate (p/kWh) 24m", "Unit Rate Uplift 24m", "TAC 24m (£)"]
+
+
+def test_filter_rows_by_mpxn_and_eac():
+    frame = priced()
+    assert filter_rows(frame).tolist() == list(range(10))
+    assert filter_rows(frame, " 0000000003 ").tolist() == [3]
+    assert filter_rows(frame, eac_min=4_000, eac_max=6_000).tolist() == [3, 4, 5]
+    assert filter_rows(frame, "00000000", eac_min=9_000).tolist() == [8, 9]
+
+
+def test_page_edits_write_back_to_full_frame_rows():
+    frame, before = priced(), priced()
+    positions = filter_rows(frame, eac_min=5_000)  # rows 4..9
+    visible = positions[2:4]  # page 2 of size 2: rows 6 and 7
+    shown = {"Unit_Rate_Uplift_24m": "Unit Rate Uplift 24m"}
+
+    delta = page_delta({"edited_rows": {"1": {"Unit_Rate_Uplift_24m": 1.5}}, "added_rows": [{}]}, visible)
+    assert delta == {"edited_rows": {7: {"Unit_Rate_Uplift_24m": 1.5}}}
+
+    frame, touched = apply_edits(frame, delta, SCHEMA, TAC_LABEL, shown)
+    assert touched == {(7, "24")}
+    assert frame["Unit Rate Uplift 24m"].tolist() == [0.0] * 7 + [1.5] + [0.0] * 2
+    changed = frame.compare(before)
+    assert list(changed.index) == [7]
+    assert {col for col, _ in changed.columns} == {"Unit Rate Uplift 24m", "TAC 24m (£)"}
+    assert frame.at[7, "TAC 24m (£)"] > before.at[7, "TAC 24m (£)"]
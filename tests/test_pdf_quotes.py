@@ -0,0 +1,33 @@
+# test_pdf_quotes.py
+# Quote zips render in spawned workers and never load fpdf into the server process.
+
+import sys
+import zipfile
+from io import BytesIO
+
+import pandas as pd
+
+from app.utils.pdf_quotes import build_quotes_zip
+
+
+def broker_output():
+    return pd.DataFrame({
+        "Company Name": ["Acme Ltd", "Acme Ltd", "Brick & Co"],
+        "MPXN": ["1001", "1002", "1003"],
+        "EAC (kWh)": [12_000.0, 8_000.0, 30_000.0],
+        "Unit Rate 12m (p/kWh)": [24.5, 25.1, 22.0],
+        "Annual Cost 12m (£)": [3_100.0, 2_150.5, 6_720.25],
+    })
+
+
+def test_one_pdf_per_company_in_frame_order():
+    data = build_quotes_zip(broker_output(), workers=2)
+    with zipfile.ZipFile(BytesIO(data)) as bundle:
+        assert bundle.namelist() == ["Acme_Ltd.pdf", "Brick_Co.pdf"]
+        assert all(bundle.read(name).startswith(b"%PDF") for name in bundle.namelist())
+    assert "fpdf" not in sys.modules
+
+
+def test_empty_frame_gives_empty_zip():
+    data = build_quotes_zip(broker_output().iloc[:0])
+    assert zipfile.ZipFile(BytesIO(data)).namelist() == []
@@ -0,0 +1,87 @@
+# test_shared_cache.py
+# The process-wide LRU: byte-bounded eviction in least-recently-used order,
+# one build per key, and views that never write through to the cached value.
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.utils.dtypes import frame_memory
+from app.utils.shared_cache import SharedCache, format_stats, value_size, view
+
+
+def frame(rows=1_000):
+    return pd.DataFrame({"EAC": np.arange(rows, dtype=float)})
+
+
+def test_lru_evicts_least_recently_used_first():
+    size = value_size(frame())
+    cache = SharedCache(max_bytes=2 * size)
+    cache.put("a", frame())
+    cache.put("b", frame())
+    cache.get("a")  # "b" is now the least recently used
+    cache.put("c", frame())
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.bytes == 2 * size and cache.stats()["evictions"] == 1
+
+
+def test_values_larger_than_the_budget_are_not_cached():
+    cache = SharedCache(max_bytes=value_size(frame()))
+    cache.put("small", frame())
+    cache.put("huge", frame(10_000))
+    assert cache.get("huge") is None and cache.get("small") is not None
+
+
+def test_value_size_sums_containers():
+    df, arr = frame(), np.zeros(100)
+    assert value_size(df) == frame_memory(df)
+    assert value_size({"x": (df, arr), "y": [arr], "z": "text"}) == frame_memory(df) + 2 * arr.nbytes
+
+
+def test_views_never_write_through():
+    cache = SharedCache()
+    cache.put("tender", {"Standard": frame(3)})
+    session = cache.get("tender")["Standard"]
+    session["EAC"] = 0.0
+    session.loc[0, "EAC"] = -1.0
+    assert cache.get("tender")["Standard"]["EAC"].tolist() == [0.0, 1.0, 2.0]
+
+    arr = view(np.arange(3))
+    assert not arr.flags.writeable
+    kept = (frame(2), "label")
+    assert view(kept)[1] == "label" and view(kept)[0] is not kept[0]
+
+
+def test_get_or_build_builds_once_across_threads():
+    cache = SharedCache()
+    builds = []
+
+    def build():
+        builds.append(1)
+        time.sleep(0.05)
+        return frame(10)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_build("k", build))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(builds) == 1 and len(results) == 4
+    assert all(r["EAC"].tolist() == list(range(10)) for r in results)
+
+
+def test_stats_and_format():
+    cache = SharedCache(max_bytes=1024 * 1024)
+    cache.get("missing")
+    cache.put("k", frame(10))
+    cache.get("k")
+    stats = cache.stats()
+    assert (stats["entries"], stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 1, 0.5)
+    assert format_stats(stats).endswith("1 hits / 1 misses (50%)")
+    cache.clear()
+    assert cache.stats()["entries"] == 0 and cache.bytes == 0
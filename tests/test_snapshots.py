@@ -0,0 +1,81 @@
+# test_snapshots.py
+# Session snapshots: edited uplift tables written as Arrow files must come
+# back unchanged, and only tables edited since the last save are rewritten.
+
+import numpy as np
+import pandas as pd
+import pytest
+import streamlit as st
+
+from app.utils import snapshots
+
+DIGEST = "0123456789abcdef0123456789abcdef"
+
+
+@pytest.fixture
+def session(tmp_path, monkeypatch):
+    monkeypatch.setattr(snapshots, "SNAPSHOT_DIR", str(tmp_path))
+    st.session_state.clear()
+    yield st.session_state
+    st.session_state.clear()
+
+
+def priced(rows=4):
+    return pd.DataFrame({
+        "MPXN": pd.Categorical([f"0{1000 + i}" for i in range(rows)]),
+        "EAC": np.linspace(1_000.0, 9_000.0, rows),
+        "Day Rate (p/kWh) 12m": np.full(rows, 21.125),
+        "Day Uplift 12m": np.zeros(rows),
+        "TAC_12m": np.full(rows, np.nan),
+    })
+
+
+def edit(state, key, frame, version=1):
+    state[f"{key}_frame"] = frame
+    state[f"{key}_fingerprint"] = (DIGEST, "Standard")
+    state[f"{key}_version"] = version
+
+
+def test_arrow_round_trip(tmp_path):
+    path = str(tmp_path / "table.arrow")
+    snapshots.write_frame(path, priced())
+    pd.testing.assert_frame_equal(snapshots.read_frame(path), priced())
+
+
+def test_save_and_restore_session(session):
+    edited = priced().assign(**{"Day Uplift 12m": [0.5, 0.0, 1.25, 0.0]})
+    edit(session, "nhh_Standard", edited)
+    session["hh_Standard_frame"] = priced()  # Never edited, so never written
+
+    assert snapshots.save_session(DIGEST, ["nhh_Standard", "hh_Standard"], file_name="tender.xlsx") == ["nhh_Standard"]
+    # Nothing changed since, so a rerun writes nothing
+    assert snapshots.save_session(DIGEST, ["nhh_Standard"]) == []
+
+    (meta,) = snapshots.list_snapshots(DIGEST)
+    assert meta["file_name"] == "tender.xlsx" and meta["frames"]["nhh_Standard"]["rows"] == 4
+    assert snapshots.list_snapshots("another tender") == []
+
+    session.clear()
+    count, _ = snapshots.restore_session(meta)
+    assert count == 1
+    pd.testing.assert_frame_equal(session["nhh_Standard_frame"], edited)
+    assert session["nhh_Standard_fingerprint"] == (DIGEST, "Standard")
+    assert snapshots.save_session(DIGEST, ["nhh_Standard"]) == []
+    assert session["snapshot_ids"][DIGEST] == meta["id"]
+
+
+def test_frames_of_another_tender_are_not_saved(session):
+    edit(session, "nhh_Standard", priced())
+    session["nhh_Standard_fingerprint"] = ("another digest", "Standard")
+    assert snapshots.save_session(DIGEST, ["nhh_Standard"]) == []
+
+
+def test_prune_keeps_the_newest(session, monkeypatch):
+    for i in range(3):
+        session.clear()
+        edit(session, "nhh_Standard", priced())
+        monkeypatch.setattr(snapshots.time, "time", lambda i=i: 1_000.0 + i)
+        snapshots.save_session(DIGEST, ["nhh_Standard"], file_name=f"tender{i}.xlsx")
+
+    snapshots.prune(keep=2)
+    assert [meta["file_name"] for meta in snapshots.list_snapshots()] == ["tender2.xlsx", "tender1.xlsx"]
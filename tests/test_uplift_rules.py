@@ -0,0 +1,87 @@
+# test_uplift_rules.py
+# Bulk uplift rules: EAC bands are [eac_min, eac_max), blank fields match
+# anything, later rules win where they overlap and unknown components fail loudly.
+
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.utils.tariff_schema import get_schema
+from app.utils.uplift_rules import UpliftRule, apply_rules, load_rules, parse_rule
+
+TERMS = ["12", "24"]
+TAC_LABEL = "TAC_{term}m"
+
+
+def nhh_table(eacs=(9_999.0, 10_000.0, 49_999.0, 50_000.0), mpxns=None):
+    """A priced NHH table: one row per EAC, flat rates and zero uplifts for every term."""
+    schema = get_schema("NHH")
+    data = {"MPXN": mpxns if mpxns is not None else [f"16{i:011d}" for i in range(len(eacs))],
+            "EAC": list(eacs)}
+    for term in TERMS:
+        for c in schema.components:
+            data[schema.rate_column(c, term)] = 10.0
+            data[schema.uplift_column(c, term)] = 0.0
+        data[TAC_LABEL.format(term=term)] = 0.0
+    return pd.DataFrame(data)
+
+
+def rule(**fields):
+    return parse_rule({"component": "Day", "uplift": 1.0, **fields})
+
+
+def test_eac_band_is_min_inclusive_max_exclusive():
+    table = nhh_table()
+    apply_rules(table, "NHH", [rule(eac_min=10_000, eac_max="50,000")], TERMS)
+    assert table["Day Uplift 12m"].tolist() == [0.0, 1.0, 1.0, 0.0]
+
+    table = nhh_table()
+    apply_rules(table, "NHH", [rule(eac_max=10_000), rule(eac_min=50_000, uplift=2.0)], TERMS)
+    assert table["Day Uplift 24m"].tolist() == [1.0, 0.0, 0.0, 2.0]
+
+
+def test_mpxn_prefix_matches_text_and_numeric_mpxns():
+    table = nhh_table(eacs=[1.0] * 3, mpxns=["0123456", "1234567", "0129999"])
+    apply_rules(table, "NHH", [rule(mpxn_prefix="012")], TERMS)
+    assert table["Day Uplift 12m"].tolist() == [1.0, 0.0, 1.0]
+
+    table = nhh_table(eacs=[1.0] * 3, mpxns=np.array([1_012_345, 2_012_345, 1_099_999]))
+    apply_rules(table, "NHH", [rule(mpxn_prefix="101")], TERMS)
+    assert table["Day Uplift 12m"].tolist() == [1.0, 0.0, 0.0]
+
+
+def test_term_rule_touches_only_that_term():
+    table = nhh_table()
+    repriced = apply_rules(table, "NHH", [rule(term="24m", component="Night Rate")], TERMS, TAC_LABEL)
+
+    assert repriced == {"24"}
+    assert (table["Night Uplift 24m"] == 1.0).all()
+    assert (table["Night Uplift 12m"] == 0.0).all() and (table["Day Uplift 24m"] == 0.0).all()
+    assert (table["TAC_24m"] > 0).all() and (table["TAC_12m"] == 0.0).all()
+
+
+def test_later_rules_win_and_other_meter_types_are_ignored():
+    table = nhh_table()
+    rules = [rule(uplift=1.0), rule(uplift=3.0, eac_min=10_000), rule(uplift=9.0, meter_type="HH")]
+    apply_rules(table, "NHH", rules, TERMS)
+    assert table["Day Uplift 12m"].tolist() == [1.0, 3.0, 3.0, 3.0]
+
+    table = nhh_table()
+    apply_rules(table, "NHH", list(reversed(rules)), TERMS)
+    assert table["Day Uplift 12m"].tolist() == [1.0, 1.0, 1.0, 1.0]
+
+
+def test_unknown_component_raises():
+    with pytest.raises(ValueError, match="'day'"):
+        rule(component="day")
+    with pytest.raises(ValueError, match="for NHH"):
+        rule(component="DUoS", meter_type="nhh")
+    with pytest.raises(ValueError):
+        load_rules(BytesIO(b'[{"component": "Dya", "uplift": 1}]'), name="rules.json")
+
+    # Rules built directly (not parsed) are checked against the tariff they are applied to
+    bad = UpliftRule("NHH", None, "Metering", 1.0, -np.inf, np.inf, None)
+    with pytest.raises(ValueError):
+        apply_rules(nhh_table(), "NHH", [bad], TERMS)